@@ -0,0 +1,56 @@
+"""
+benchmark of the process pool fitness evaluation against the serial numpy evaluation, to find the population size
+from which the pool pays off on this machine.
+run from the repository root:
+    python -m benchmarks.parallel [--workers N] [--chunk-size N]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, simulate_population
+from genetic_algorithem.parallel import ParallelEvaluator, DEFAULT_CHUNK_SIZE
+from genetic_algorithem.rng import RandomStreams
+
+POPULATION_SIZES = [20, 100, 1000, 10000, 100000]
+GRID_SIZE = 100
+OBSTACLES_SHARE = 0.2
+REPEAT = 3
+SEED = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process pool fitness evaluation benchmark")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: number of CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="chromosomes per worker task")
+    args = parser.parse_args(argv)
+
+    genetic_alg = GeneticAlg(2, GRID_SIZE, (0, 0), (GRID_SIZE - 1, GRID_SIZE - 1), OBSTACLES_SHARE, backend='numpy',
+                             rng=SEED)
+    samples = RandomStreams(SEED).population
+    evaluator = ParallelEvaluator(genetic_alg, args.workers, args.chunk_size)
+    # warm up the pool so process start up isn't measured
+    evaluator.evaluate(np.zeros((evaluator.workers, genetic_alg.chromosome_len), dtype=np.uint8))
+
+    print("workers: {}, chunk size: {}".format(evaluator.workers, evaluator.chunk_size))
+    print("population    serial [ms]    process [ms]    speedup")
+    crossover = None
+    for pop_size in POPULATION_SIZES:
+        codes = samples.integers(len(GeneticAlg.Directions), size=(pop_size, genetic_alg.chromosome_len),
+                                 dtype=np.uint8)
+        serial = min(timeit.repeat(lambda: simulate_population(codes, *evaluator.grid), number=1, repeat=REPEAT))
+        process = min(timeit.repeat(lambda: evaluator.evaluate(codes), number=1, repeat=REPEAT))
+        if crossover is None and process < serial:
+            crossover = pop_size
+        print("{:<14}{:>11.2f}{:>16.2f}{:>10.2f}x".format(pop_size, serial * 1e3, process * 1e3, serial / process))
+    evaluator.close()
+
+    if crossover is None:
+        print("the process pool did not pay off for any tested population size")
+    else:
+        print("the process pool pays off from population size {}".format(crossover))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+benchmark of the heuristic seeding strategies: generations and wall time until the best path is optimal, for a
+random initial population and for each seeding strategy, over a few boards and seeds.
+run from the repository root:
+    python -m benchmarks.seeding [--seed-fraction 0.25] [--seeds 5]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, MAX_GENERATIONS_LARGE_BOARD
+from genetic_algorithem.seeding import SEEDING_STRATEGIES
+
+# (board size, obstacles share)
+BOARDS = [(30, 0), (30, 0.2), (100, 0.1)]
+POPULATION_SIZE = 40
+DEFAULT_SEED_FRACTION = 0.25
+DEFAULT_SEEDS = 5
+# None is the random initial population, all strategies together are the last variant
+VARIANTS = [None] + [[strategy] for strategy in SEEDING_STRATEGIES] + [SEEDING_STRATEGIES]
+
+
+def run(board_size, obstacles_share, seed, seed_fraction, strategies):
+    """
+    :return: generations until the best path is optimal (or the limit), whether it is optimal and the wall time
+    """
+    start = time.perf_counter()
+    genetic_alg = GeneticAlg(POPULATION_SIZE, board_size, (0, 0), (board_size - 1, board_size - 1), obstacles_share,
+                             backend='numpy', rng=seed, seed_fraction=seed_fraction if strategies else 0,
+                             seed_strategies=strategies)
+    while not genetic_alg.is_optimal and genetic_alg.cur_generation < MAX_GENERATIONS_LARGE_BOARD:
+        genetic_alg.new_generation()
+    return genetic_alg.cur_generation, genetic_alg.is_optimal, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Heuristic seeding benchmark")
+    parser.add_argument('--seed-fraction', type=float, default=DEFAULT_SEED_FRACTION,
+                        help="share of the initial population that is seeded")
+    parser.add_argument('--seeds', type=int, default=DEFAULT_SEEDS, help="runs of every board and variant")
+    args = parser.parse_args(argv)
+
+    print("board  obstacles  seeding                    generations  optimal    wall [s]")
+    for board_size, obstacles_share in BOARDS:
+        for strategies in VARIANTS:
+            results = np.array([run(board_size, obstacles_share, seed, args.seed_fraction, strategies)
+                                for seed in range(args.seeds)])
+            generations, optimal, wall_time = results.mean(axis=0)
+            print("{:<7}{:>8.0f}%  {:<25}{:>12.1f}{:>8.0f}%{:>12.3f}".format(
+                board_size, obstacles_share * 100, '+'.join(strategies) if strategies else 'random',
+                generations, optimal * 100, wall_time))
+
+
+if __name__ == '__main__':
+    main()
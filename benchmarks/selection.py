@@ -0,0 +1,75 @@
+"""
+benchmark of the parent selection operators: the time to select the parents of a whole generation, against
+Generator.choice with p, for growing populations, and the generations until the best path is optimal for every
+operator over a few boards and seeds.
+run from the repository root:
+    python -m benchmarks.selection [--seeds 5]
+"""
+import argparse
+import time
+import timeit
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, ELITISM, MAX_GENERATIONS_LARGE_BOARD
+from genetic_algorithem.selection import SELECTION_METHODS, make_selection
+
+POPULATION_SIZES = [20, 1000, 10000, 100000]
+REPEATS = 20
+# (board size, obstacles share)
+BOARDS = [(10, 0), (10, 0.2), (30, 0)]
+POPULATION_SIZE = 40
+DEFAULT_SEEDS = 5
+
+
+def time_selection(select, pop_size, generator):
+    """
+    :param select: function of (fitness, shape) that returns the parent indices
+    :return: median time in milliseconds of selecting the parents of one generation
+    """
+    fitness = generator.random(pop_size)
+    fitness = (fitness / fitness.sum()).tolist()
+    shape = (pop_size - int(pop_size * ELITISM), 2)
+    timer = timeit.Timer(lambda: select(fitness, shape))
+    return 1e3 * float(np.median(timer.repeat(REPEATS, number=1)))
+
+
+def run(board_size, obstacles_share, seed, selection):
+    """
+    :return: generations until the best path is optimal (or the limit), whether it is optimal and the wall time
+    """
+    start = time.perf_counter()
+    genetic_alg = GeneticAlg(POPULATION_SIZE, board_size, (0, 0), (board_size - 1, board_size - 1), obstacles_share,
+                             backend='numpy', rng=seed, selection=selection)
+    while not genetic_alg.is_optimal and genetic_alg.cur_generation < MAX_GENERATIONS_LARGE_BOARD:
+        genetic_alg.new_generation()
+    return genetic_alg.cur_generation, genetic_alg.is_optimal, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parent selection benchmark")
+    parser.add_argument('--seeds', type=int, default=DEFAULT_SEEDS, help="runs of every board and operator")
+    args = parser.parse_args(argv)
+
+    generator = np.random.default_rng(0)
+    methods = [('choice', lambda fitness, shape: generator.choice(len(fitness), shape, p=fitness))]
+    for name in SELECTION_METHODS:
+        selection = make_selection(name)
+        methods.append((name, lambda fitness, shape, selection=selection: selection.select(fitness, shape,
+                                                                                             generator)))
+    print("selection time [ms]" + "".join("{:>12}".format(pop_size) for pop_size in POPULATION_SIZES))
+    for name, select in methods:
+        print("{:<19}".format(name) + "".join("{:>12.3f}".format(time_selection(select, pop_size, generator))
+                                               for pop_size in POPULATION_SIZES))
+
+    print("\nboard  obstacles  selection    generations  optimal    wall [s]")
+    for board_size, obstacles_share in BOARDS:
+        for name in SELECTION_METHODS:
+            results = np.array([run(board_size, obstacles_share, seed, name) for seed in range(args.seeds)])
+            generations, optimal, wall_time = results.mean(axis=0)
+            print("{:<7}{:>8.0f}%  {:<13}{:>12.1f}{:>8.0f}%{:>12.3f}".format(
+                board_size, obstacles_share * 100, name, generations, optimal * 100, wall_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+startup benchmark: the import time of the modules batch jobs and worker processes start with, measured with
+python -X importtime in fresh interpreters. numpy is needed by all of them and its import time depends on the
+installation, so every module has a budget for the time it takes on top of importing numpy. the fastest of a few
+runs is reported, since other processes only ever make an import slower.
+the batch modules must not import tkinter or matplotlib, those are only loaded by the GUI when a board is drawn or
+a plot is requested.
+stale bytecode is compiled on import and counted as import time, so compile the sources first.
+run from the repository root:
+    python -m compileall -q genetic_algorithem
+    python -m benchmarks.startup [--repeats 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# module and import time budget in milliseconds, without numpy
+BUDGETS_MS = [
+    ('genetic_algorithem.genetic_alg', 10),
+    ('genetic_algorithem.parallel', 30),
+    ('genetic_algorithem.termination', 5),
+    ('genetic_algorithem.checkpoint', 15),
+    ('genetic_algorithem.headless', 25),
+    ('genetic_algorithem.islands', 50),
+    ('genetic_algorithem.multi_query', 45),
+    ('genetic_algorithem.sweep', 45),
+]
+# modules that must not be imported by a batch module
+GUI_MODULES = ['tkinter', 'matplotlib']
+DEFAULT_REPEATS = 5
+SLOWEST_IMPORTS = 4
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """
+    import a module in a fresh interpreter
+    :param module: module name
+    :return: dictionary of the import time in microseconds of every imported module, without the modules it imported,
+    and the list of GUI_MODULES that were imported
+    """
+    code = "import sys, {}; print(','.join(m for m in {!r} if m in sys.modules))".format(module, GUI_MODULES)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=REPOSITORY_DIR,
+                             capture_output=True, text=True, check=True)
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # a module is only listed once, when it is first imported
+        times[name.strip()] = int(self_us)
+    gui_modules = process.stdout.strip()
+    return times, gui_modules.split(',') if gui_modules else []
+
+
+def measure(module, repeats, excluded=()):
+    """
+    :param excluded: modules that aren't counted
+    :return: the fastest total import time in milliseconds of the modules that aren't excluded, and from that run
+    the import time in milliseconds of every one of them and the GUI modules that were imported
+    """
+    fastest = None
+    for i in range(repeats):
+        times, gui_modules = import_times(module)
+        times = {name: self_us / 1e3 for name, self_us in times.items() if name not in excluded}
+        total = sum(times.values())
+        if fastest is None or total < fastest[0]:
+            fastest = (total, times, gui_modules)
+    return fastest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import time benchmark of the batch modules")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS, help="fresh interpreters per module")
+    args = parser.parse_args(argv)
+
+    # numpy and the modules it imports itself are not counted, whichever module happens to import them first
+    numpy_time, numpy_times, _ = measure('numpy', args.repeats)
+    print("numpy import: {:.1f} ms".format(numpy_time))
+    failures = 0
+    print("module                              own [ms]  budget [ms]  slowest imports besides numpy [ms]")
+    for module, budget in BUDGETS_MS:
+        own, times, gui_modules = measure(module, args.repeats, numpy_times)
+        slowest = sorted(times.items(), key=lambda item: -item[1])[:SLOWEST_IMPORTS]
+        print("{:<36}{:>8.1f}{:>13}  {}".format(
+            module, own, budget, ", ".join("{} {:.1f}".format(name, self_ms) for name, self_ms in slowest)))
+        if own > budget:
+            print("OVER BUDGET " + module)
+            failures += 1
+        if gui_modules:
+            print("GUI IMPORTS {}: {}".format(module, ", ".join(gui_modules)))
+            failures += 1
+    print("{} startup failures".format(failures))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+benchmark suite of the GeneticAlg hot paths. for every combination of grid size, population size and obstacles
+percent it times make_step, calc_chromosom_dst, fitness, generate_chromosome, mutate_chromosome and new_generation,
+runs the algorithm to convergence, and measures the peak memory of a few generations.
+results are saved as json, and compared against a stored baseline so regressions of the GA core are caught.
+run from the repository root, for example:
+    python -m benchmarks.suite --quick
+    python -m benchmarks.suite --update-baseline
+    python -m benchmarks.suite --grid-sizes 100 --populations 1000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, FITNESS_BACKENDS, MAX_GENERATIONS, \
+    MAX_GENERATIONS_LARGE_BOARD, OUTPUTS_DIR
+from genetic_algorithem.rng import RandomStreams
+
+GRID_SIZES = [10, 100, 500]
+POPULATION_SIZES = [20, 100, 1000, 10000]
+OBSTACLES_PERCENTS = [0, 10, 30]
+# a smaller matrix for a quick check
+QUICK_GRID_SIZES = [10, 100]
+QUICK_POPULATION_SIZES = [20, 1000]
+QUICK_OBSTACLES_PERCENTS = [0, 30]
+
+SEED = 0
+# timed calls of every operation, make_step is timed in batches of MAKE_STEP_BATCH moves since a single move
+# is shorter than the timer resolution
+OP_SAMPLES = 200
+MAKE_STEP_BATCH = 100
+GENERATION_SAMPLES = 10
+MEMORY_GENERATIONS = 3
+PERCENTILES = [50, 90, 99]
+# an operation is reported as a regression when its median is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.2
+
+DEFAULT_RESULTS_FILE = os.path.join(OUTPUTS_DIR, 'benchmark_suite.json')
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def latency_stats(samples_ns, ops_per_sample=1):
+    """
+    :param samples_ns: timed samples in nanoseconds
+    :param ops_per_sample: number of operations in a single sample
+    :return: dictionary of per-operation latency percentiles and mean in microseconds
+    """
+    latencies = np.asarray(samples_ns, dtype=float) / ops_per_sample / 1e3
+    stats = {'samples': len(latencies), 'mean_us': float(latencies.mean())}
+    for percentile, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+        stats['p{}_us'.format(percentile)] = float(value)
+    return stats
+
+
+def time_calls(function, args_list):
+    """
+    :param function: timed function
+    :param args_list: arguments of every timed call
+    :return: list of call durations in nanoseconds
+    """
+    samples = []
+    for args in args_list:
+        start = time.perf_counter_ns()
+        function(*args)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def create_genetic_alg(grid_size, pop_size, obstacles_percent, backend, seed=SEED):
+    """
+    create a GeneticAlg with the source and destination in opposite corners, so every cell has the same workload
+    """
+    return GeneticAlg(pop_size, grid_size, (0, 0), (grid_size - 1, grid_size - 1), obstacles_percent / 100,
+                      backend=backend, rng=seed)
+
+
+def benchmark_operations(genetic_alg):
+    """
+    time every hot path operation of a GeneticAlg object. new_generation is timed last since it changes the population
+    :return: dictionary of operation name to latency stats
+    """
+    grid_size = genetic_alg.grid_size
+    samples = RandomStreams(SEED).population
+    ops = {}
+
+    positions = samples.integers(0, grid_size, size=(OP_SAMPLES, MAKE_STEP_BATCH, 2)).tolist()
+    directions = samples.choice(GeneticAlg.Directions, size=(OP_SAMPLES, MAKE_STEP_BATCH)).tolist()
+
+    def make_steps(batch_positions, batch_directions):
+        for position, direction in zip(batch_positions, batch_directions):
+            genetic_alg.make_step(tuple(position), direction)
+
+    ops['make_step'] = latency_stats(time_calls(make_steps, zip(positions, directions)), MAKE_STEP_BATCH)
+
+    chromosomes = genetic_alg.cur_gen_codes[np.arange(OP_SAMPLES) % genetic_alg.population_size].tolist()
+    ops['calc_chromosom_dst'] = latency_stats(time_calls(genetic_alg.calc_chromosom_dst,
+                                                         [(chromosome,) for chromosome in chromosomes]))
+    ops['fitness'] = latency_stats(time_calls(genetic_alg.fitness, [()] * GENERATION_SAMPLES))
+
+    son = np.empty(genetic_alg.chromosome_len, dtype=np.uint8)
+    probability = genetic_alg.cur_gen_fitness
+    ops['generate_chromosome'] = latency_stats(time_calls(genetic_alg.generate_chromosome,
+                                                          [(probability, son)] * OP_SAMPLES))
+    ops['mutate_chromosome'] = latency_stats(time_calls(genetic_alg.mutate_chromosome, [(son,)] * OP_SAMPLES))
+    ops['new_generation'] = latency_stats(time_calls(genetic_alg.new_generation, [()] * GENERATION_SAMPLES))
+    return ops
+
+
+def benchmark_run(grid_size, pop_size, obstacles_percent, backend, max_generations):
+    """
+    run the algorithm until the best path is optimal or the generations limit is reached
+    :return: dictionary of run results
+    """
+    genetic_alg = create_genetic_alg(grid_size, pop_size, obstacles_percent, backend)
+    start = time.perf_counter()
+    while not genetic_alg.is_optimal and genetic_alg.cur_generation < max_generations:
+        genetic_alg.new_generation()
+    wall_time = time.perf_counter() - start
+    genetic_alg.close()
+    return {
+        'generations': genetic_alg.cur_generation,
+        'is_optimal': genetic_alg.is_optimal,
+        'wall_time': wall_time,
+        'generations_per_second': genetic_alg.cur_generation / wall_time if wall_time > 0 else None,
+    }
+
+
+def benchmark_memory(grid_size, pop_size, obstacles_percent, backend):
+    """
+    peak memory allocated by python and numpy while creating a GeneticAlg and running a few generations.
+    it is measured in its own pass, since tracemalloc slows down the timed code
+    :return: peak memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        genetic_alg = create_genetic_alg(grid_size, pop_size, obstacles_percent, backend)
+        for i in range(MEMORY_GENERATIONS):
+            genetic_alg.new_generation()
+        genetic_alg.close()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def benchmark_case(grid_size, pop_size, obstacles_percent, backend, max_generations=None):
+    """
+    all benchmarks of a single matrix cell
+    :return: result dictionary
+    """
+    if max_generations is None:
+        max_generations = MAX_GENERATIONS if grid_size <= 10 else MAX_GENERATIONS_LARGE_BOARD
+    genetic_alg = create_genetic_alg(grid_size, pop_size, obstacles_percent, backend)
+    ops = benchmark_operations(genetic_alg)
+    genetic_alg.close()
+    return {
+        'board_size': grid_size,
+        'population': pop_size,
+        'obstacles_percent': obstacles_percent,
+        'backend': backend,
+        'ops': ops,
+        'run': benchmark_run(grid_size, pop_size, obstacles_percent, backend, max_generations),
+        'peak_memory': benchmark_memory(grid_size, pop_size, obstacles_percent, backend),
+    }
+
+
+def case_key(result):
+    return result['board_size'], result['population'], result['obstacles_percent'], result['backend']
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    compare the median latency of every operation, and the generations per second of the full runs, with a baseline
+    :param results: list of result dictionaries
+    :param baseline: list of baseline result dictionaries, cells missing in the baseline are skipped
+    :param tolerance: allowed slowdown ratio
+    :return: list of (case key, metric, baseline value, current value, slowdown) of the regressions
+    """
+    baseline_cases = {case_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_cases.get(case_key(result))
+        if base is None:
+            continue
+        metrics = [(op, base['ops'][op]['p50_us'], stats['p50_us']) for op, stats in result['ops'].items()
+                   if op in base['ops']]
+        # a full run that converged in a different number of generations is a different workload
+        base_gps, gps = base['run']['generations_per_second'], result['run']['generations_per_second']
+        if base['run']['generations'] == result['run']['generations'] and base_gps and gps:
+            metrics.append(('seconds_per_generation', 1 / base_gps, 1 / gps))
+        for metric, base_value, value in metrics:
+            slowdown = value / base_value if base_value > 0 else 1.0
+            if slowdown > 1 + tolerance:
+                regressions.append((case_key(result), metric, base_value, value, slowdown))
+    return regressions
+
+
+def print_result(result):
+    print("board {board_size}, population {population}, obstacles {obstacles_percent}%, {backend}".format(**result))
+    for op, stats in result['ops'].items():
+        print("    {:<22}{:>12.2f}{:>12.2f}{:>12.2f}".format(op, stats['p50_us'], stats['p90_us'], stats['p99_us']))
+    run = result['run']
+    print("    run: {} generations, optimal: {}, {:.1f} generations/s, peak memory {:.2f} MB".format(
+        run['generations'], run['is_optimal'], run['generations_per_second'] or 0, result['peak_memory'] / 2 ** 20))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GeneticAlg hot paths benchmark suite")
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=None, help="board sizes")
+    parser.add_argument('--populations', type=int, nargs='+', default=None, help="population sizes")
+    parser.add_argument('--obstacles', type=float, nargs='+', default=None, help="obstacles percents")
+    parser.add_argument('--quick', action='store_true', help="use the small default matrix")
+    parser.add_argument('--backend', choices=FITNESS_BACKENDS, default='numpy', help="fitness evaluation backend")
+    parser.add_argument('--max-generations', type=int, default=None,
+                        help="generations limit of the full runs (default: the GUI limit for the board size)")
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help="results json file")
+    parser.add_argument('--baseline', default=None,
+                        help="baseline json file to compare with (default: {} if it exists)".format(BASELINE_FILE))
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a metric is reported as a regression, 0.2 is 20%%")
+    parser.add_argument('--update-baseline', action='store_true', help="save the results as the new baseline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    grid_sizes = args.grid_sizes or (QUICK_GRID_SIZES if args.quick else GRID_SIZES)
+    populations = args.populations or (QUICK_POPULATION_SIZES if args.quick else POPULATION_SIZES)
+    obstacles = args.obstacles or (QUICK_OBSTACLES_PERCENTS if args.quick else OBSTACLES_PERCENTS)
+
+    print("latency [us]                    p50         p90         p99")
+    results = []
+    for grid_size, pop_size, obstacles_percent in itertools.product(grid_sizes, populations, obstacles):
+        result = benchmark_case(grid_size, pop_size, obstacles_percent, args.backend, args.max_generations)
+        print_result(result)
+        results.append(result)
+
+    report = {'environment': environment(), 'results': results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+    print("Results saved to " + args.output)
+    if args.update_baseline:
+        with open(BASELINE_FILE, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print("Baseline saved to " + BASELINE_FILE)
+        return 0
+
+    baseline_path = args.baseline or (BASELINE_FILE if os.path.exists(BASELINE_FILE) else None)
+    if baseline_path is None:
+        return 0
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for key, metric, base_value, value, slowdown in regressions:
+        print("REGRESSION board {}, population {}, obstacles {}%, {}: {} {:.2f} -> {:.2f} ({:.2f}x)".format(
+            *key, metric, base_value, value, slowdown))
+    print("{} regressions against {}".format(len(regressions), baseline_path))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
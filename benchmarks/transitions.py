@@ -0,0 +1,63 @@
+"""
+micro-benchmark of a single grid move: GeneticAlg.make_step against a lookup in the precomputed transition tables.
+run from the repository root:
+    python -m benchmarks.transitions
+"""
+import timeit
+
+from genetic_algorithem.genetic_alg import GeneticAlg
+from genetic_algorithem.rng import RandomStreams
+
+GRID_SIZES = [10, 100, 1000]
+OBSTACLES_SHARE = 0.3
+SAMPLES = 100000
+REPEAT = 5
+SEED = 0
+
+
+def create_genetic_alg(grid_size):
+    """
+    create a small GeneticAlg on the given grid, the population is irrelevant for this benchmark
+    :param grid_size: size of 2d grid
+    :return: GeneticAlg object
+    """
+    return GeneticAlg(2, grid_size, (0, 0), (grid_size - 1, grid_size - 1), OBSTACLES_SHARE, backend='numpy',
+                      rng=SEED)
+
+
+def benchmark(grid_size):
+    """
+    time make_step and the table lookup over the same random (position, direction) samples
+    :param grid_size: size of 2d grid
+    :return: nanoseconds per move for make_step and for the table lookup
+    """
+    genetic_alg = create_genetic_alg(grid_size)
+    samples = RandomStreams(SEED).population
+    positions = [tuple(position) for position in samples.integers(0, grid_size, size=(SAMPLES, 2)).tolist()]
+    directions = samples.choice(GeneticAlg.Directions, size=SAMPLES).tolist()
+    cells = [genetic_alg.cell_index(position) for position in positions]
+    codes = [GeneticAlg.Directions.index(direction) for direction in directions]
+    transitions, step_penalties = genetic_alg.transitions, genetic_alg.step_penalties
+
+    def make_steps():
+        for position, direction in zip(positions, directions):
+            genetic_alg.make_step(position, direction)
+
+    def lookup_steps():
+        for cell, code in zip(cells, codes):
+            transitions[cell, code], step_penalties[cell, code]
+
+    make_step_time = min(timeit.repeat(make_steps, number=1, repeat=REPEAT))
+    lookup_time = min(timeit.repeat(lookup_steps, number=1, repeat=REPEAT))
+    return make_step_time / SAMPLES * 1e9, lookup_time / SAMPLES * 1e9
+
+
+def main():
+    print("grid    make_step [ns]    lookup [ns]    speedup")
+    for grid_size in GRID_SIZES:
+        make_step_ns, lookup_ns = benchmark(grid_size)
+        print("{:<8}{:>14.1f}{:>15.1f}{:>10.2f}x".format(grid_size, make_step_ns, lookup_ns, make_step_ns / lookup_ns))
+
+
+if __name__ == '__main__':
+    main()
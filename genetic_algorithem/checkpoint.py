@@ -0,0 +1,179 @@
+"""
+checkpoint and resume of long runs. a checkpoint is a compressed npz snapshot of everything the following
+generations depend on: the grid, the population and its fitness, the statistics lists, the generation counter and
+the state of the random streams, so a resumed run creates the same generations as a run that was never interrupted.
+the snapshot arrays are copied between generations, compressing and writing them happens on a background thread
+while the run continues. the file is replaced atomically, a crash while writing leaves the previous checkpoint.
+the fitness cache isn't saved, the first generation of a resumed run is walked without cached parent walks.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, OUTPUTS_DIR
+from genetic_algorithem.rng import RandomStreams
+from genetic_algorithem.selection import make_selection
+
+CHECKPOINT_DIR = os.path.join(OUTPUTS_DIR, 'checkpoints')
+DEFAULT_CHECKPOINT_EVERY = 50
+
+# scalar attributes of a GeneticAlg object saved as json in the snapshot
+SCALAR_ATTRIBUTES = ['grid_size', 'population_size', 'chromosome_len', 'stall_limit', 'cur_generation',
+                     'cur_best_length', 'cur_worst_length', 'cur_best_distance', 'cur_worst_distance', 'is_optimal',
+                     'stop_reason']
+
+
+def snapshot(genetic_alg):
+    """
+    copy the state of a GeneticAlg object between generations
+    :param genetic_alg: GeneticAlg object
+    :return: dictionary of numpy arrays, see write_snapshot
+    """
+    meta = {name: getattr(genetic_alg, name) for name in SCALAR_ATTRIBUTES}
+    meta.update({
+        'src': list(genetic_alg.src),
+        'dst': list(genetic_alg.dst),
+        'cur_best_location': list(genetic_alg.cur_best_location),
+        'cur_worst_location': list(genetic_alg.cur_worst_location),
+        'variable_length': genetic_alg.cur_gen_lengths is not None,
+        'selection': genetic_alg.selection.name,
+        'seed': genetic_alg.random.seed,
+        'random_state': genetic_alg.random.get_state(),
+    })
+    state = {
+        'meta': np.array(json.dumps(meta)),
+        'obstacles': np.array(genetic_alg.obstacles, dtype=np.int64).reshape(-1, 2),
+        'initial_codes': genetic_alg.initial_codes.copy(),
+        'cur_gen_codes': genetic_alg.cur_gen_codes.copy(),
+        'cur_gen_fitness': np.array(genetic_alg.cur_gen_fitness, dtype=np.float64),
+        'best_fitness': np.array(genetic_alg.best_fitness, dtype=np.float64),
+        'worst_fitness': np.array(genetic_alg.worst_fitness, dtype=np.float64),
+        'average_fitness': np.array(genetic_alg.average_fitness, dtype=np.float64),
+        'prev_best_path': np.array(genetic_alg.prev_best_path, dtype=np.int64).reshape(-1, 2),
+        'cur_best_path': np.array(genetic_alg.cur_best_path, dtype=np.int64).reshape(-1, 2),
+    }
+    if genetic_alg.cur_gen_lengths is not None:
+        state['initial_lengths'] = genetic_alg.initial_lengths.copy()
+        state['cur_gen_lengths'] = genetic_alg.cur_gen_lengths.copy()
+    return state
+
+
+def write_snapshot(state, path):
+    """
+    write a snapshot to a compressed npz file, replacing the file only once it is complete
+    :param state: dictionary returned by snapshot
+    :param path: checkpoint file
+    :return:
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    partial_path = path + '.partial'
+    with open(partial_path, 'wb') as checkpoint_file:
+        np.savez_compressed(checkpoint_file, **state)
+    os.replace(partial_path, path)
+
+
+def load_meta(path):
+    """
+    :param path: checkpoint file
+    :return: dictionary of the scalar state of the checkpoint, e.g. its grid_size and cur_generation
+    """
+    with np.load(path) as checkpoint:
+        return json.loads(checkpoint['meta'].item())
+
+
+def restore(path, trace=None, recorder=None, checkpointer=None, selection=None, **kwargs):
+    """
+    create a GeneticAlg object in the state of a checkpoint. the checkpoint generation isn't evaluated again,
+    trace, recorder and checkpointer only receive the generations after it
+    :param path: checkpoint file
+    :param selection: parent selection operator, by default the selection method of the checkpoint. an operator
+    of another method raises ValueError
+    :param kwargs: other GeneticAlg parameters, e.g. backend, cache_size or profiler
+    :return: GeneticAlg object
+    """
+    with np.load(path) as checkpoint:
+        state = {name: checkpoint[name] for name in checkpoint.files}
+    meta = json.loads(state['meta'].item())
+    selection = make_selection(selection if selection is not None else meta['selection'])
+    if selection.name != meta['selection']:
+        raise ValueError("The checkpoint run uses {} selection, not {}".format(meta['selection'], selection.name))
+    streams = RandomStreams(meta['seed'])
+    genetic_alg = GeneticAlg(meta['population_size'], meta['grid_size'], tuple(meta['src']), tuple(meta['dst']),
+                             rng=streams, obstacles=[tuple(obstacle) for obstacle in state['obstacles'].tolist()],
+                             chromosome_len=meta['chromosome_len'], variable_length=meta['variable_length'],
+                             stall_limit=meta['stall_limit'], selection=selection, evaluate=False, **kwargs)
+    streams.set_state(meta['random_state'])
+    for name in SCALAR_ATTRIBUTES:
+        setattr(genetic_alg, name, meta[name])
+    genetic_alg.cur_best_location = tuple(meta['cur_best_location'])
+    genetic_alg.cur_worst_location = tuple(meta['cur_worst_location'])
+    genetic_alg.initial_codes = state['initial_codes']
+    genetic_alg.cur_gen_codes[:] = state['cur_gen_codes']
+    if meta['variable_length']:
+        genetic_alg.initial_lengths = state['initial_lengths']
+        genetic_alg.cur_gen_lengths[:] = state['cur_gen_lengths']
+    genetic_alg.cur_gen_fitness = state['cur_gen_fitness'].tolist()
+    genetic_alg.best_fitness = state['best_fitness'].tolist()
+    genetic_alg.worst_fitness = state['worst_fitness'].tolist()
+    genetic_alg.average_fitness = state['average_fitness'].tolist()
+    genetic_alg.prev_best_path = [tuple(position) for position in state['prev_best_path'].tolist()]
+    genetic_alg.cur_best_path = [tuple(position) for position in state['cur_best_path'].tolist()]
+    genetic_alg.trace = trace
+    genetic_alg.recorder = recorder
+    genetic_alg.checkpointer = checkpointer
+    return genetic_alg
+
+
+class Checkpointer:
+    def __init__(self, path=None, every=DEFAULT_CHECKPOINT_EVERY):
+        """
+        :param path: checkpoint file, by default a new time stamped file under outputs/checkpoints
+        :param every: a checkpoint is written every this many generations
+        """
+        if every < 1:
+            raise ValueError("every must be positive")
+        from concurrent.futures import ThreadPoolExecutor
+        self.path = path or os.path.join(CHECKPOINT_DIR, time.strftime('%Y%m%d_%H%M%S') + '.npz')
+        self.every = every
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+        # generation of the last checkpoint, None before the first one
+        self.generation = None
+
+    def update(self, genetic_alg):
+        """
+        called after every generation, writes a checkpoint every self.every generations
+        :param genetic_alg: GeneticAlg object
+        :return:
+        """
+        if genetic_alg.cur_generation % self.every == 0:
+            self.save(genetic_alg)
+
+    def save(self, genetic_alg):
+        """
+        snapshot the current generation and write it on the background thread
+        :param genetic_alg: GeneticAlg object
+        :return:
+        """
+        state = snapshot(genetic_alg)
+        # at most one write is in flight, so the checkpoints replace each other in generation order
+        self.wait()
+        self.pending = self.executor.submit(write_snapshot, state, self.path)
+        self.generation = genetic_alg.cur_generation
+
+    def wait(self):
+        """
+        block until the last checkpoint is written, raising its error if the write failed
+        :return:
+        """
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.result()
+
+    def close(self):
+        self.wait()
+        self.executor.shutdown()
@@ -0,0 +1,89 @@
+"""
+bounded LRU memoization of chromosome walks. an entry keeps the final (position, path length) of a chromosome,
+and its walk state every CHECKPOINT_EVERY genes, so a son that shares a prefix with this chromosome
+(after a single point crossover) can resume its walk from the checkpoint instead of from the source.
+with the default parameters the cache makes a run slower, it is kept for experiments with other settings. only
+the elites are exact hits (about 10% of the lookups), and a son usually mutates within its first genes
+(MUTATION_P is 0.15 per gene), so a resumed walk skips only about 3 genes. hashing every chromosome and keeping
+the checkpoints costs more than that saves. on a 100x100 board with 20% obstacles it took 3.7 instead of 3.3 ms
+per generation of 60 chromosomes with the numpy backend, and 13 instead of 9.5 ms for 1000 chromosomes.
+shorter checkpoint intervals skip a few more genes and are slower still.
+"""
+import hashlib
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 10000
+CHECKPOINT_EVERY = 8
+
+
+class FitnessCache:
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, checkpoint_every=CHECKPOINT_EVERY):
+        """
+        :param max_size: maximal number of chromosomes in the cache, the least recently used ones are evicted
+        :param checkpoint_every: walk state is kept for every checkpoint_every genes
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.checkpoint_every = checkpoint_every
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.prefix_hits = 0
+        self.genes_skipped = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(chromosome):
+        """
+        compact hash of a chromosome
+        :param chromosome: row of direction indices
+        :return: 16 bytes digest
+        """
+        return hashlib.blake2b(chromosome.tobytes(), digest_size=16).digest()
+
+    def get(self, key):
+        """
+        look up a chromosome and mark it as recently used, counting a hit or a miss
+        :param key: chromosome key
+        :return: (position, path length, checkpoints) or None
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return entry
+
+    def peek(self, key):
+        """
+        look up a chromosome without counting or reordering
+        """
+        return self.entries.get(key)
+
+    def put(self, key, position, path_len, checkpoints):
+        """
+        :param key: chromosome key
+        :param position: final (x,y) position of the walk
+        :param path_len: final path length
+        :param checkpoints: array of (cell, path length, penalty) walk states before genes 0, checkpoint_every, ...
+        :return:
+        """
+        self.entries[key] = (position, path_len, checkpoints)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'prefix_hits': self.prefix_hits,
+            'genes_skipped': self.genes_skipped,
+            'evictions': self.evictions,
+        }
@@ -1,20 +1,179 @@
-import random
-import operator
+import logging
+import os
+import time
 import numpy as np
 
+from genetic_algorithem.profiling import NULL_PHASE
+from genetic_algorithem.rng import make_streams
+from genetic_algorithem.selection import make_selection
+
+logger = logging.getLogger(__name__)
+
+# log level for per-chromosome diagnostics, below logging.DEBUG
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
 # set default parameters
+MAX_GENERATIONS = 300
+MAX_GENERATIONS_LARGE_BOARD = 500
 ELITISM = 0.1
 RECOMBINATION_P = 0.7
 # mutation should be bigger
 MUTATION_P = 0.15
 DEFAULT_OBSTACLES = 0
+# penalty added to the path length when a step bumps into an obstacle
+OBSTACLE_PENALTY = 5
+# variable length chromosomes: probability that a son's length changes, and the largest change in genes
+LENGTH_MUTATION_P = 0.2
+LENGTH_MUTATION_STEP = 3
+
+# fitness evaluation backends: 'python' walks one chromosome at a time, 'numpy' simulates the whole population at once
+# and 'process' splits the population to chunks that are simulated on a process pool
+FITNESS_BACKENDS = ('python', 'numpy', 'process')
+DEFAULT_BACKEND = 'python'
+
+# run results, traces and other artifacts are written here
+OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'outputs')
+
+# (row, column) movement for each direction, in the same order as GeneticAlg.Directions
+DIRECTION_DELTAS = np.array([[-1, 0], [1, 0], [0, -1], [0, 1]])
+
+
+def simulate_population(codes, transitions, step_penalties, src_cell, dst_cell, start=None, checkpoint_every=0,
+                        counters=None, lengths=None, stall_limit=None):
+    """
+    walk all chromosomes together, one gene column per step, with the same obstacle penalty
+    and early stop at the destination rules of GeneticAlg.calc_chromosom_dst.
+    :param codes: integer array of direction indices in the shape (population size, chromosome length)
+    :param transitions: next cell table, see build_transition_tables
+    :param step_penalties: obstacle penalty table, see build_transition_tables
+    :param src_cell: starting cell index
+    :param dst_cell: target cell index
+    :param start: optional walk state to resume each chromosome from, rows of (gene index, cell, path length, penalty).
+    genes before the gene index are not simulated
+    :param checkpoint_every: record the walk state every checkpoint_every genes, 0 for no checkpoints
+    :param counters: optional dictionary, the walked genes, moves into obstacles and moves off the grid are added to
+    its 'steps', 'obstacle_hits' and 'wall_bumps' values
+    :param lengths: optional length of every chromosome, genes after it are not walked
+    :param stall_limit: optional dead end rule, a walk stops after this many consecutive moves that stay in place
+    :return: final cell index and final path length arrays, and the checkpoints array in the shape
+    (population size, chromosome length // checkpoint_every + 1, 3) of (cell, path length, penalty) rows,
+    or None if no checkpoints were requested
+    """
+    if start is None:
+        first_gene = np.zeros(len(codes), dtype=np.int64)
+        cells = np.full(len(codes), src_cell, dtype=np.int64)
+        path_len = np.zeros(len(codes), dtype=np.int64)
+        penalty = np.zeros(len(codes), dtype=np.int64)
+    else:
+        first_gene, cells, path_len, penalty = np.array(start, dtype=np.int64).reshape(-1, 4).T
+    checkpoints = None
+    if checkpoint_every > 0:
+        # checkpoints before the first simulated gene keep the start state, callers that resume a chromosome
+        # fill them from the chromosome it was resumed from
+        checkpoints = np.empty((len(codes), codes.shape[1] // checkpoint_every + 1, 3), dtype=np.int64)
+        checkpoints[:] = np.stack([cells, path_len, penalty], axis=1)[:, None]
+
+    stalled = np.zeros(len(codes), dtype=np.int64) if stall_limit is not None else None
+    last_gene = codes.shape[1] if lengths is None or len(codes) == 0 else min(int(lengths.max()), codes.shape[1])
+    gene_idx = first = int(first_gene.min()) if len(codes) > 0 else 0
+    for gene_idx in range(first, last_gene):
+        remaining = cells != dst_cell
+        if lengths is not None:
+            remaining &= gene_idx < lengths
+        if stalled is not None:
+            remaining &= stalled < stall_limit
+        if not remaining.any():
+            break
+        if checkpoints is not None and gene_idx % checkpoint_every == 0:
+            checkpoints[:, gene_idx // checkpoint_every] = np.stack([cells, path_len, penalty], axis=1)
+
+        active = remaining & (first_gene <= gene_idx)
+        genes = codes[:, gene_idx]
+        path_len += active * (1 + penalty)
+        next_cells = transitions[cells, genes]
+        step_penalty = step_penalties[cells, genes]
+
+        # a robot that stays in place doesn't extend its path, but pays the obstacle penalty
+        stayed = active & (next_cells == cells)
+        path_len += stayed * (step_penalty - 1)
+        if counters is not None:
+            obstacle_hits = np.count_nonzero(stayed & (step_penalty > 0))
+            counters['steps'] += int(np.count_nonzero(active))
+            counters['obstacle_hits'] += int(obstacle_hits)
+            counters['wall_bumps'] += int(np.count_nonzero(stayed) - obstacle_hits)
+        if stalled is not None:
+            stalled = np.where(stayed, stalled + 1, np.where(active, 0, stalled))
+        cells = np.where(active, next_cells, cells)
+        penalty = np.where(active, step_penalty, penalty)
+    else:
+        gene_idx = last_gene
+    if checkpoints is not None:
+        # the walk state doesn't change after the last simulated gene
+        checkpoints[:, -(-gene_idx // checkpoint_every):] = np.stack([cells, path_len, penalty], axis=1)[:, None]
+    return cells, path_len, checkpoints
+
+
+def bfs_distances(transitions, start_cell):
+    """
+    number of moves from a cell to every cell of the grid, found by a breadth first search over the transition table,
+    one frontier of cells per step. moves are reversible, so this is also the distance from every cell to start_cell
+    :param transitions: next cell table, see build_transition_tables
+    :param start_cell: cell index the search starts from
+    :return: int32 array of the distance of every cell, -1 for cells that can't be reached
+    """
+    distances = np.full(len(transitions), -1, dtype=np.int32)
+    distances[start_cell] = 0
+    frontier = np.array([start_cell])
+    distance = 0
+    while len(frontier) > 0:
+        distance += 1
+        neighbours = np.unique(transitions[frontier].ravel())
+        frontier = neighbours[distances[neighbours] < 0]
+        distances[frontier] = distance
+    return distances
+
+
+def build_transition_tables(occupancy):
+    """
+    precompute the result of GeneticAlg.make_step for every cell and direction on a grid.
+    :param occupancy: boolean obstacle bitmap of the grid
+    :return: next cell table and obstacle penalty table, both in the shape (grid_size * grid_size, len(Directions))
+    """
+    grid_size = len(occupancy)
+    cells = np.arange(grid_size ** 2)
+    rows, cols = np.divmod(cells, grid_size)
+    next_rows = rows[:, None] + DIRECTION_DELTAS[:, 0]
+    next_cols = cols[:, None] + DIRECTION_DELTAS[:, 1]
+    in_grid = (next_rows >= 0) & (next_rows < grid_size) & \
+              (next_cols >= 0) & (next_cols < grid_size)
+    hit = in_grid & occupancy[next_rows.clip(0, grid_size - 1), next_cols.clip(0, grid_size - 1)]
+    moved = in_grid & ~hit
+    transitions = np.where(moved, next_rows * grid_size + next_cols, cells[:, None]).astype(np.int32)
+    step_penalties = (hit * OBSTACLE_PENALTY).astype(np.int8)
+    return transitions, step_penalties
+
+
+def draw_obstacles(generator, grid_size, obstacles_share):
+    """
+    random obstacle positions. positions may repeat, duplicates are dropped (keeping the draw order)
+    :param generator: np.random.Generator the positions are drawn from
+    :param grid_size: size of 2d grid
+    :param obstacles_share: share of obstacle squares in the grid, between 0 and 1
+    :return: list of (x,y) positions
+    """
+    obstacles_cnt = int(obstacles_share * (grid_size ** 2))
+    return list(dict.fromkeys(map(tuple, generator.integers(0, grid_size, size=(obstacles_cnt, 2)).tolist())))
 
 
 class GeneticAlg:
     Directions = ['U', 'D', 'L', 'R']
 
     def __init__(self, pop_size, grid_size, src, dst,
-                 obstacles_share=DEFAULT_OBSTACLES):
+                 obstacles_share=DEFAULT_OBSTACLES, backend=DEFAULT_BACKEND, workers=None, chunk_size=None,
+                 trace=None, cache_size=0, recorder=None, history_len=None, rng=None,
+                 profiler=None, obstacles=None, chromosome_len=None, variable_length=False, stall_limit=None,
+                 seed_fraction=0, seed_strategies=None, board=None, checkpointer=None, selection=None, evaluate=True):
         """
         create the genetic algorithem object with required initializations
         :param pop_size: size of initial population
@@ -22,33 +181,140 @@ class GeneticAlg:
         :param src: starting (x,y) position
         :param dst: target (x,y) position
         :param obstacles_share: % of required squares in the grid, can be 0 if no obstacles are in the grid
+        :param backend: fitness evaluation backend, one of FITNESS_BACKENDS
+        :param workers: number of worker processes for the 'process' backend, by default the number of CPUs
+        :param chunk_size: number of chromosomes in a single worker task for the 'process' backend
+        :param trace: optional sink that receives every generation population and fitness, see tracing.TraceSink
+        :param cache_size: number of chromosome walks to memoize between generations, 0 disables the fitness cache.
+        the cache makes runs with the default parameters slower, see fitness_cache
+        :param recorder: optional statistics recorder that receives every generation, see stats.StatsRecorder
+        :param history_len: keep at least this many generations in the best/worst/average fitness lists,
+        None to keep all of them
+        :param rng: rng.RandomStreams object or a seed for one, the population, obstacles and reproduction each draw
+        from their own stream. None for a random run
+        :param profiler: optional profiling.PhaseProfiler that times every phase of a generation and counts the moves
+        :param obstacles: list of obstacle (x,y) positions, e.g. to run several populations on the same grid.
+        by default obstacles_share of the grid is drawn at random
+        :param chromosome_len: number of genes of a chromosome, by default 2.5 times the grid size.
+        with variable_length this is the longest possible chromosome
+        :param variable_length: every chromosome has its own length, which starts between the manhattan distance and
+        twice the distance from src to dst and mutates, so the walks are as long as the paths need
+        :param stall_limit: stop a walk as a dead end after this many consecutive moves into walls or obstacles,
+        None to always walk the whole chromosome
+        :param seed_fraction: share of the initial population created by heuristics instead of at random
+        :param seed_strategies: heuristics of the seeded chromosomes, by default all of seeding.SEEDING_STRATEGIES
+        :param board: optional multi_query.Board, a grid shared by several GeneticAlg objects. its obstacles and
+        tables are used instead of building new ones, src and dst must not be its obstacles
+        :param checkpointer: optional checkpoint.Checkpointer that receives every new generation
+        :param selection: parent selection operator, or the name of one of selection.SELECTION_METHODS,
+        by default fitness proportional roulette selection
+        :param evaluate: evaluate the initial population. False leaves the generation state to the caller,
+        e.g. checkpoint.restore, which restores it from a checkpoint
         """
+        if backend not in FITNESS_BACKENDS:
+            raise ValueError("Unknown fitness backend: " + str(backend))
+        if stall_limit is not None and stall_limit < 1:
+            raise ValueError("stall_limit must be positive")
+        self.backend = backend
+        self.trace = trace
+        self.recorder = recorder
+        self.checkpointer = checkpointer
+        self.history_len = history_len
+        self.random = make_streams(rng)
+        self.profiler = profiler
+        self.selection = make_selection(selection)
         self.elitism_cnt = int(pop_size * ELITISM)
         self.grid_size = grid_size
         self.src = src
         self.dst = dst
         self.population_size = pop_size
-        self.chromosome_len = int(2.5 * grid_size)
-        print("Chromosome length: " + str(self.chromosome_len))
-
-        # initialize a chromosome representation for each instance in the population, in the size of chromosome_len
-        self.initial_population = [[random.choice(self.Directions) for i in range(self.chromosome_len)]
-                                   for j in range(pop_size)]
-
-        # initialize obstacles on the grid
-        self.obstacles_len = int(obstacles_share * (grid_size ** 2))
-        self.obstacles = [(random.randint(0, grid_size - 1), random.randint(0, grid_size - 1)) for i in
-                          range(self.obstacles_len)]
-
-        # make sure src  and dst are'nt an obstacle
-        if self.obstacles.count(self.src) > 0:
-            self.obstacles.remove(self.src)
-        if self.obstacles.count(self.dst) > 0:
-            self.obstacles.remove(self.dst)
-
-        print("Random population:")
-        print(self.initial_population)
-        self.cur_gen_population = self.initial_population[:]
+        self.chromosome_len = chromosome_len or int(2.5 * grid_size)
+        self.stall_limit = stall_limit
+        logger.info("Chromosome length: %d", self.chromosome_len)
+
+        # initialize a chromosome representation for each instance in the population, in the size of chromosome_len.
+        # the population is a single (pop_size, chromosome_len) array of direction indices, chromosomes are its rows
+        self.initial_codes = self.random.population.integers(len(self.Directions),
+                                                             size=(pop_size, self.chromosome_len), dtype=np.uint8)
+        # variable length chromosomes are the first genes of their rows, the genes after a row's length are kept
+        # so a chromosome that grows gets random genes. None when all chromosomes have chromosome_len genes
+        self.min_chromosome_len = min(max(1, self.l1_distance(src)), self.chromosome_len)
+        self.initial_lengths = None
+        if variable_length:
+            self.initial_lengths = self.random.population.integers(
+                self.min_chromosome_len, min(2 * self.min_chromosome_len, self.chromosome_len) + 1, size=pop_size)
+
+        self.board = board
+        if board is not None:
+            if board.occupancy[src] or board.occupancy[dst]:
+                raise ValueError("src and dst must not be obstacles of the board")
+            self.obstacles = board.obstacles
+            self.obstacles_len = len(self.obstacles)
+            self.occupancy = board.occupancy
+            self.transitions, self.step_penalties = board.transitions, board.step_penalties
+        else:
+            # initialize obstacles on the grid
+            if obstacles is None:
+                obstacles = draw_obstacles(self.random.obstacles, grid_size, obstacles_share)
+            obstacles = dict.fromkeys(map(tuple, obstacles))
+
+            # make sure src  and dst are'nt an obstacle
+            obstacles.pop(self.src, None)
+            obstacles.pop(self.dst, None)
+            self.obstacles = list(obstacles)
+            self.obstacles_len = len(self.obstacles)
+
+            # occupancy bitmap of the grid, used for O(1) obstacle lookup in every movement routine
+            self.occupancy = np.zeros((grid_size, grid_size), dtype=bool)
+            if self.obstacles_len > 0:
+                self.occupancy[tuple(np.array(self.obstacles).T)] = True
+
+            # the grid is static for the whole run, so every move is precomputed into next cell and penalty tables
+            self.transitions, self.step_penalties = self.build_transitions()
+
+        # breadth first search distance of every cell to dst around the obstacles, -1 for cells that can't reach it
+        if board is not None:
+            self.dst_distances = board.distance_field(dst)
+        else:
+            self.dst_distances = bfs_distances(self.transitions, self.cell_index(dst))
+        self.dst_reachable = bool(self.dst_distances[self.cell_index(src)] >= 0)
+        # distance of every cell the fitness is based on. the walks never leave the cells reachable from src, so when
+        # dst is one of them these are true path lengths, otherwise the manhattan distance is all there is to go by
+        if self.dst_reachable:
+            self.fitness_distances = self.dst_distances
+        else:
+            rows, cols = np.divmod(np.arange(grid_size ** 2), grid_size)
+            self.fitness_distances = np.abs(rows - dst[0]) + np.abs(cols - dst[1])
+        self.direction_letters = np.array([ord(direction) for direction in self.Directions], dtype=np.uint8)
+
+        self.evaluator = None
+        if backend == 'process':
+            from genetic_algorithem.parallel import ParallelEvaluator, DEFAULT_CHUNK_SIZE
+            self.evaluator = ParallelEvaluator(self, workers, chunk_size or DEFAULT_CHUNK_SIZE)
+
+        # memoized walks, with the keys of the current and previous generation chromosomes and for every son
+        # the parent it shares a prefix with, so its walk can resume from the parent's checkpoint
+        self.fitness_cache = None
+        if cache_size > 0:
+            from genetic_algorithem.fitness_cache import FitnessCache
+            self.fitness_cache = FitnessCache(cache_size)
+        self.cur_gen_keys = None
+        self.parent_keys = None
+        self.lineage = None
+
+        if seed_fraction > 0:
+            from genetic_algorithem.seeding import seed_population
+            seed_population(self, int(round(seed_fraction * pop_size)), seed_strategies)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Random population: %s", self.initial_population)
+        self.cur_gen_codes = self.initial_codes.copy()
+        # new generations are written here, then the two buffers are swapped
+        self.next_gen_codes = np.empty_like(self.cur_gen_codes)
+        self.cur_gen_lengths = self.next_gen_lengths = None
+        if self.initial_lengths is not None:
+            self.cur_gen_lengths = self.initial_lengths.copy()
+            self.next_gen_lengths = np.empty_like(self.cur_gen_lengths)
         self.cur_gen_fitness = []
         self.best_fitness = []
         self.worst_fitness = []
@@ -60,12 +326,64 @@ class GeneticAlg:
         self.cur_best_length = 0
         self.cur_worst_location = src
         self.cur_worst_length = 0
-        self.best_possible_len = self.l1_distance(src)
-        print("Best possible length: " + str(self.best_possible_len))
+        self.best_possible_len = self.dst_distance(src)
+        logger.info("Best possible length: %d", self.best_possible_len)
         self.is_optimal = src == dst
+        # why the run stopped, set by termination.Termination
+        self.stop_reason = None
         self.cur_worst_distance = 0
         self.cur_best_distance = 0
-        self.update_statistics(self.fitness())
+        # seconds the last fitness evaluation took
+        self.eval_time = 0
+        if evaluate:
+            self.update_statistics(self.fitness())
+
+    @property
+    def initial_population(self):
+        """
+        first generation chromosomes as direction strings, for display
+        """
+        return self.decode_population(self.initial_codes, self.initial_lengths)
+
+    @property
+    def cur_gen_population(self):
+        """
+        current generation chromosomes as direction strings, for display
+        """
+        return self.decode_population(self.cur_gen_codes, self.cur_gen_lengths)
+
+    def decode_population(self, codes, lengths=None):
+        """
+        convert an array of direction indices to direction strings
+        :param codes: integer array in the shape (population size, chromosome length)
+        :param lengths: optional length of every chromosome
+        :return: list of direction strings, one for each chromosome
+        """
+        genes = self.direction_letters[codes].tobytes().decode('ascii')
+        length = codes.shape[1]
+        if lengths is None:
+            return [genes[i:i + length] for i in range(0, len(genes), length)]
+        return [genes[i * length:i * length + n] for i, n in enumerate(lengths.tolist())]
+
+    def chromosome_lists(self, codes, lengths=None):
+        """
+        :param codes: integer array in the shape (population size, chromosome length)
+        :param lengths: optional length of every chromosome
+        :return: list of chromosomes, each one a list of direction indices cut to its length
+        """
+        if lengths is None:
+            return codes.tolist()
+        return [row[:n] for row, n in zip(codes.tolist(), lengths.tolist())]
+
+    def chromosome(self, index):
+        """
+        :param index: chromosome index in the current generation
+        :return: list of direction indices, cut to the chromosome length
+        """
+        chromosome = self.cur_gen_codes[index]
+        if self.cur_gen_lengths is not None:
+            chromosome = chromosome[:self.cur_gen_lengths[index]]
+        return chromosome.tolist()
 
     def l1_distance(self, location):
         """
@@ -75,26 +393,58 @@ class GeneticAlg:
         """
         return abs(int(location[0]) - self.dst[0]) + abs(int(location[1]) - self.dst[1])
 
+    def dst_distance(self, location):
+        """
+        length of the shortest path between input location and the destination around the obstacles, see
+        fitness_distances
+        :param location: input location
+        :return: distance between input location and the destination (self.dst)
+        """
+        return int(self.fitness_distances[location[0] * self.grid_size + location[1]])
+
+    def cell_index(self, position):
+        """
+        cells are numbered row by row, this is the index of a (x,y) position in the transition tables
+        :param position: (x,y) position on the grid
+        :return: cell index
+        """
+        return position[0] * self.grid_size + position[1]
+
+    def cell_position(self, cell):
+        """
+        inverse of cell_index
+        :param cell: cell index
+        :return: (x,y) position on the grid
+        """
+        return divmod(int(cell), self.grid_size)
+
+    def build_transitions(self):
+        """
+        precompute the result of make_step for every cell and direction on the grid, see build_transition_tables
+        :return: next cell table and obstacle penalty table, both in the shape (grid_size * grid_size, len(Directions))
+        """
+        return build_transition_tables(self.occupancy)
+
     def make_step(self, position, step):
         obs_panalty = 0
         if step == 'U' and position[0] > 0:
-            if self.obstacles.count((position[0] - 1, position[1])) > 0:
-                obs_panalty = 5
+            if self.occupancy[position[0] - 1, position[1]]:
+                obs_panalty = OBSTACLE_PENALTY
             else:
                 return (position[0] - 1, position[1]), obs_panalty
         if step == 'D' and position[0] < self.grid_size - 1:
-            if self.obstacles.count((position[0] + 1, position[1])) > 0:
-                obs_panalty = 5
+            if self.occupancy[position[0] + 1, position[1]]:
+                obs_panalty = OBSTACLE_PENALTY
             else:
                 return (position[0] + 1, position[1]), obs_panalty
         if step == 'L' and position[1] > 0:
-            if self.obstacles.count((position[0], position[1] - 1)) > 0:
-                obs_panalty = 5
+            if self.occupancy[position[0], position[1] - 1]:
+                obs_panalty = OBSTACLE_PENALTY
             else:
                 return (position[0], position[1] - 1), obs_panalty
         if step == 'R' and position[1] < self.grid_size - 1:
-            if self.obstacles.count((position[0], position[1] + 1)) > 0:
-                obs_panalty = 5
+            if self.occupancy[position[0], position[1] + 1]:
+                obs_panalty = OBSTACLE_PENALTY
             else:
                 return (position[0], position[1] + 1), obs_panalty
         return position, obs_panalty
@@ -102,24 +452,166 @@ class GeneticAlg:
     def calc_chromosom_dst(self, chromosom):
         """
         base on chromosom pate, make all path steps to get it's final destination on the grid
-        :param chromosom: representation of the path on the grid
+        :param chromosom: representation of the path on the grid, a sequence of direction indices
         :return: destination point on the grid and the final path length
         """
-        position = self.src
+        cell = self.cell_index(self.src)
+        dst_cell = self.cell_index(self.dst)
         path_len = 0
         penalty = 0
-        for step in chromosom:
-            if position == self.dst:
+        stall_limit = self.stall_limit
+        stalled = 0
+        for code in chromosom:
+            if cell == dst_cell:
                 break
 
             path_len += 1
             path_len += penalty
-            next_step, penalty = self.make_step(position, step)
-            if position == next_step:
+            next_cell = self.transitions[cell, code]
+            penalty = 0
+            if cell == next_cell:
+                penalty = int(self.step_penalties[cell, code])
                 path_len -= 1
                 path_len += penalty
-            position = next_step
-        return position, path_len
+                stalled += 1
+                if stalled == stall_limit:
+                    break
+            else:
+                stalled = 0
+            cell = next_cell
+        return self.cell_position(cell), path_len
+
+    def walk_chromosome(self, chromosome, start=None, checkpoint_every=0, length=None):
+        """
+        version of calc_chromosom_dst that can resume from a walk state and record checkpoints, see simulate_population
+        :param chromosome: list of direction indices
+        :param start: (gene index, cell, path length, penalty) to resume from, None to start at the source
+        :param checkpoint_every: record the walk state every checkpoint_every genes, 0 for no checkpoints
+        :param length: walk only the first genes of the chromosome, the checkpoints still cover all of it
+        :return: final cell, final path length and list of (cell, path length, penalty) checkpoints, or None
+        """
+        first_gene, cell, path_len, penalty = start if start is not None else (0, self.cell_index(self.src), 0, 0)
+        dst_cell = self.cell_index(self.dst)
+        checkpoints = None
+        if checkpoint_every > 0:
+            checkpoints = [(cell, path_len, penalty)] * (len(chromosome) // checkpoint_every + 1)
+
+        stall_limit = self.stall_limit
+        stalled = 0
+        end = len(chromosome) if length is None else length
+        gene_idx = first_gene
+        for gene_idx in range(first_gene, end):
+            if cell == dst_cell:
+                break
+            if checkpoints is not None and gene_idx % checkpoint_every == 0:
+                checkpoints[gene_idx // checkpoint_every] = (cell, path_len, penalty)
+
+            code = chromosome[gene_idx]
+            path_len += 1 + penalty
+            next_cell = int(self.transitions[cell, code])
+            penalty = 0
+            if cell == next_cell:
+                penalty = int(self.step_penalties[cell, code])
+                path_len += penalty - 1
+                stalled += 1
+                if stalled == stall_limit:
+                    gene_idx += 1
+                    break
+            else:
+                stalled = 0
+            cell = next_cell
+        else:
+            gene_idx = end
+        if checkpoints is not None:
+            first_unset = -(-gene_idx // checkpoint_every)
+            checkpoints[first_unset:] = [(cell, path_len, penalty)] * (len(checkpoints) - first_unset)
+        return cell, path_len, checkpoints
+
+    def simulate(self, codes, start=None, checkpoint_every=0, lengths=None):
+        """
+        walk chromosomes with the selected backend, see simulate_population for the parameters and results
+        """
+        if self.backend == 'process':
+            return self.evaluator.evaluate(codes, start, checkpoint_every, lengths, self.stall_limit)
+        if self.backend == 'numpy':
+            return simulate_population(codes, self.transitions, self.step_penalties, self.cell_index(self.src),
+                                       self.cell_index(self.dst), start, checkpoint_every,
+                                       lengths=lengths, stall_limit=self.stall_limit)
+        walks = [self.walk_chromosome(chromosome, None if start is None else start[i].tolist(), checkpoint_every,
+                                      None if lengths is None else int(lengths[i]))
+                 for i, chromosome in enumerate(codes.tolist())]
+        cells = np.array([walk[0] for walk in walks], dtype=np.int64)
+        path_len = np.array([walk[1] for walk in walks], dtype=np.int64)
+        checkpoints = np.array([walk[2] for walk in walks], dtype=np.int64) if checkpoint_every > 0 else None
+        return cells, path_len, checkpoints
+
+    def cached_population_dst(self):
+        """
+        destinations of the current generation through the fitness cache. chromosomes that are in the cache
+        (elites, and sons that were copied without a mutation) are not walked at all, and sons that share a prefix
+        with a cached parent resume the walk from the parent's last checkpoint within that prefix.
+        :return: list of (destination point on the grid, final path length) for each chromosome
+        """
+        cache = self.fitness_cache
+        if self.cur_gen_lengths is None:
+            keys = [cache.key(chromosome) for chromosome in self.cur_gen_codes]
+        else:
+            keys = [cache.key(chromosome[:n]) for chromosome, n in zip(self.cur_gen_codes, self.cur_gen_lengths)]
+        chromo_dst_tup = [None] * len(keys)
+        missed = {}
+        for i, key in enumerate(keys):
+            if key in missed:
+                # the same son twice in a generation is walked once
+                missed[key].append(i)
+                cache.hits += 1
+                continue
+            entry = cache.get(key)
+            if entry is None:
+                missed[key] = [i]
+            else:
+                chromo_dst_tup[i] = entry[:2]
+        self.cur_gen_keys = keys
+        if not missed:
+            return chromo_dst_tup
+
+        rows = [indices[0] for indices in missed.values()]
+        start = np.zeros((len(rows), 4), dtype=np.int64)
+        start[:, 1] = self.cell_index(self.src)
+        inherited = {}
+        if self.lineage is not None:
+            parents, prefix_len = self.lineage
+            for j, row in enumerate(rows):
+                checkpoint = prefix_len[row] // cache.checkpoint_every
+                if parents[row] < 0 or checkpoint == 0:
+                    continue
+                parent = cache.peek(self.parent_keys[parents[row]])
+                if parent is not None:
+                    start[j, 0] = checkpoint * cache.checkpoint_every
+                    start[j, 1:] = parent[2][checkpoint]
+                    inherited[j] = parent[2][:checkpoint + 1]
+            cache.prefix_hits += len(inherited)
+            cache.genes_skipped += int(start[:, 0].sum())
+
+        lengths = self.cur_gen_lengths[rows] if self.cur_gen_lengths is not None else None
+        cells, path_len, checkpoints = self.simulate(self.cur_gen_codes[rows], start, cache.checkpoint_every, lengths)
+        for j, parent_checkpoints in inherited.items():
+            checkpoints[j, :len(parent_checkpoints)] = parent_checkpoints
+        destinations = self.decode_destinations(cells, path_len)
+        for (key, indices), destination, walk_checkpoints in zip(missed.items(), destinations, checkpoints):
+            cache.put(key, destination[0], destination[1], walk_checkpoints.copy())
+            for i in indices:
+                chromo_dst_tup[i] = destination
+        return chromo_dst_tup
+
+    def decode_destinations(self, cells, path_len):
+        """
+        convert simulation results to the (position, path length) tuples returned by calc_chromosom_dst
+        :param cells: final cell index of each chromosome
+        :param path_len: final path length of each chromosome
+        :return: list of (destination point on the grid, final path length) for each chromosome
+        """
+        rows, cols = np.divmod(cells, self.grid_size)
+        return [((row, col), length) for row, col, length in zip(rows.tolist(), cols.tolist(), path_len.tolist())]
 
     def fitness(self):
         """
@@ -127,29 +619,64 @@ class GeneticAlg:
         :return: 
         chromo_dst_tup- fitness for each chromosom
         """
-        chromo_dst_tup = []
-        for i in range(len(self.cur_gen_population)):
-            chromo_dst = self.calc_chromosom_dst(self.cur_gen_population[i])
-            print(chromo_dst)
-            chromo_dst_tup.append(chromo_dst)
+        start = time.perf_counter()
+        with self.phase('simulation'):
+            if self.fitness_cache is not None:
+                chromo_dst_tup = self.cached_population_dst()
+            elif self.backend == 'python':
+                chromo_dst_tup = [self.calc_chromosom_dst(chromosome) for chromosome in
+                                  self.chromosome_lists(self.cur_gen_codes, self.cur_gen_lengths)]
+            else:
+                cells, path_len, checkpoints = self.simulate(self.cur_gen_codes, lengths=self.cur_gen_lengths)
+                chromo_dst_tup = self.decode_destinations(cells, path_len)
+        if self.profiler is not None:
+            # the backends don't count moves, so the generation is walked again in a phase of its own
+            with self.phase('counters'):
+                simulate_population(self.cur_gen_codes, self.transitions, self.step_penalties,
+                                    self.cell_index(self.src), self.cell_index(self.dst),
+                                    counters=self.profiler.counters, lengths=self.cur_gen_lengths,
+                                    stall_limit=self.stall_limit)
+        if logger.isEnabledFor(TRACE):
+            for chromo_dst in chromo_dst_tup:
+                logger.log(TRACE, "Chromosome destination and length: %s", chromo_dst)
 
-        # fitness is 1/[distance from algo destination + number of steps]
-        fitness = [1 / (3*self.l1_distance(chromo_dst[0]) + chromo_dst[1]) for chromo_dst in
-                   chromo_dst_tup]
-        s = sum(fitness)
-        self.cur_gen_fitness = [f / s for f in fitness]
+        with self.phase('fitness'):
+            # fitness is 1/[distance from algo destination + number of steps]. the sum is only 0 for the empty path
+            # of a run whose src is dst, every other path is at least 1 step or 3 distance units long
+            fitness = [1 / max(3*self.dst_distance(chromo_dst[0]) + chromo_dst[1], 1) for chromo_dst in
+                       chromo_dst_tup]
+            s = sum(fitness)
+            self.cur_gen_fitness = [f / s for f in fitness]
+        self.eval_time = time.perf_counter() - start
+        if self.trace is not None:
+            self.trace.record(self.cur_generation, self.cur_gen_codes, chromo_dst_tup, self.cur_gen_fitness)
 
         return chromo_dst_tup
 
-    def get_path(self, directions):
-        cur = self.src
+    def phase(self, name):
+        """
+        :param name: phase name
+        :return: context that times the phase with the profiler, or a do-nothing context without a profiler
+        """
+        return self.profiler.phase(name) if self.profiler is not None else NULL_PHASE
+
+    def get_path(self, chromosome):
+        """
+        all grid positions the robot visits when following a chromosome, until it reaches the destination
+        :param chromosome: sequence of direction indices
+        :return: list of (x,y) positions
+        """
+        cell = self.cell_index(self.src)
+        dst_cell = self.cell_index(self.dst)
         path = []
-        for direction in directions:
-            next_step, penalty = self.make_step(cur, direction)
-            path.append(next_step)
-            if next_step == self.dst:
+        stalled = 0
+        for code in chromosome:
+            next_cell = self.transitions[cell, code]
+            stalled = stalled + 1 if next_cell == cell else 0
+            cell = next_cell
+            path.append(self.cell_position(cell))
+            if cell == dst_cell or stalled == self.stall_limit:
                 break
-            cur = next_step
         return path
 
     def update_statistics(self, chromopath_dest_len):
@@ -158,65 +685,120 @@ class GeneticAlg:
         :param chromopath_dest_len:
         :return:
         """
-        best_fitness_idx = np.argmax(self.cur_gen_fitness)
-        worst_fitness_idx = np.argmin(self.cur_gen_fitness)
+        with self.phase('statistics'):
+            best_fitness_idx = np.argmax(self.cur_gen_fitness)
+            worst_fitness_idx = np.argmin(self.cur_gen_fitness)
 
-        self.best_fitness.append(self.cur_gen_fitness[best_fitness_idx])
-        self.worst_fitness.append(self.cur_gen_fitness[worst_fitness_idx])
-        self.average_fitness.append(np.mean(self.cur_gen_fitness))
+            self.best_fitness.append(self.cur_gen_fitness[best_fitness_idx])
+            self.worst_fitness.append(self.cur_gen_fitness[worst_fitness_idx])
+            self.average_fitness.append(np.mean(self.cur_gen_fitness))
+            if self.history_len is not None and len(self.best_fitness) >= 2 * self.history_len:
+                # trim in batches, so each generation costs O(1) on average
+                for history in (self.best_fitness, self.worst_fitness, self.average_fitness):
+                    del history[:-self.history_len]
 
-        if chromopath_dest_len is not None:
-            self.cur_best_location = chromopath_dest_len[best_fitness_idx][0]
-            self.cur_best_length = chromopath_dest_len[best_fitness_idx][1]
+            if chromopath_dest_len is not None:
+                self.cur_best_location = chromopath_dest_len[best_fitness_idx][0]
+                self.cur_best_length = chromopath_dest_len[best_fitness_idx][1]
 
-            self.cur_worst_location = chromopath_dest_len[worst_fitness_idx][0]
-            self.cur_worst_length = chromopath_dest_len[worst_fitness_idx][1]
+                self.cur_worst_location = chromopath_dest_len[worst_fitness_idx][0]
+                self.cur_worst_length = chromopath_dest_len[worst_fitness_idx][1]
 
-            self.cur_best_distance = self.l1_distance(chromopath_dest_len[best_fitness_idx][0])
-            self.cur_worst_distance = self.l1_distance(chromopath_dest_len[worst_fitness_idx][0])
+                self.cur_best_distance = self.dst_distance(chromopath_dest_len[best_fitness_idx][0])
+                self.cur_worst_distance = self.dst_distance(chromopath_dest_len[worst_fitness_idx][0])
 
-        self.prev_best_path = self.cur_best_path[:]
-        self.cur_best_path = self.get_path(self.cur_gen_population[best_fitness_idx])
-        self.is_optimal = self.cur_best_location == self.dst and self.cur_best_length <= self.best_possible_len
+            self.prev_best_path = self.cur_best_path[:]
+            with self.phase('get_path'):
+                self.cur_best_path = self.get_path(self.chromosome(best_fitness_idx))
+            self.is_optimal = self.cur_best_location == self.dst and self.cur_best_length <= self.best_possible_len
+            if self.recorder is not None:
+                self.recorder.record(self)
 
-    def generate_chromosome(self, cur_gen_probability):
+    def generate_chromosome(self, cur_gen_probability, son):
         """
         create new generation chromosome based on 2 parants selection from previous generation population.
         parants are selected based on given probabilities.
         :param cur_gen_probability:
+        :param son: row of the next generation buffer the chromosome is written to
         :return: new generation son that is a combination of 2 parants, or a copy of one of them
         """
-        parent_index1, parent_index2 = np.random.choice(self.population_size, 2, p=cur_gen_probability)
-        parent1, parent2 = self.cur_gen_population[parent_index1], self.cur_gen_population[parent_index2]
+        rng = self.random.reproduction
+        parent_index1, parent_index2 = self.selection.select(cur_gen_probability, 2, rng)
+        parent1, parent2 = self.cur_gen_codes[parent_index1], self.cur_gen_codes[parent_index2]
 
         # create combined sons in probability RECOMBINATION_P, or reproduce parants in probability 1 - RECOMBINATION_P
-        should_recombine = np.random.choice([True, False], 1,
-                                            p=[RECOMBINATION_P, 1 - RECOMBINATION_P])
-        if should_recombine:
-            cutidx=random.randint(0, self.chromosome_len - 1)
-            son1 = parent1[:cutidx]
-            son1.extend(parent2[cutidx:])
-            son2 = parent2[:cutidx]
-            son2.extend(parent1[cutidx:])
-        else:
-            son1, son2 = parent1, parent2
-        son_index = np.random.choice(2)
-        return son1 if son_index == 1 else son2
+        should_recombine = rng.random() < RECOMBINATION_P
+        cutidx = rng.integers(0, self.chromosome_len) if should_recombine else 0
+        son_index = rng.integers(2)
+        # son 1 starts with parent1 and son 2 starts with parent2, the tail comes from the other parent
+        head, tail = (parent1, parent2) if son_index == 1 else (parent2, parent1)
+        son[:cutidx] = head[:cutidx]
+        son[cutidx:] = tail[cutidx:] if should_recombine else head[cutidx:]
+        return son
 
     def mutate_chromosome(self, chromosome):
         """
         for each cell in the chromozon, make a selection if to mutaste it in MUTATION_P probability.
-        if mutation is required, and new direction value will be randomly selected for this cell
-        :param chromosome:
-        :return:
+        if mutation is required, and new direction value will be randomly selected for this cell.
+        the chromosome is mutated in place.
+        :param chromosome: row of direction indices
+        :return: the mutated chromosome
         """
-        mutated_chromosome = chromosome[:]
-        should_mutate_chromosome = np.random.choice([True, False], self.chromosome_len,
-                                                    p=[MUTATION_P, 1 - MUTATION_P])
-        for i in range(self.chromosome_len):
-            if should_mutate_chromosome[i]:
-                mutated_chromosome[i] = random.choice(self.Directions)
-        return mutated_chromosome
+        rng = self.random.reproduction
+        should_mutate_chromosome = rng.random(self.chromosome_len) < MUTATION_P
+        chromosome[should_mutate_chromosome] = rng.integers(len(self.Directions),
+                                                            size=np.count_nonzero(should_mutate_chromosome))
+        return chromosome
+
+    def reproduce(self, sons, lengths=None):
+        """
+        batched version of generate_chromosome and mutate_chromosome, all sons of the next generation are created
+        together: parent pairs, recombination coin flips, cut indices, son picks and the mutation mask are each drawn
+        for the whole batch in a single call.
+        :param sons: rows of the next generation buffer the new chromosomes are written to
+        :param lengths: rows of the next generation lengths buffer, for variable length chromosomes
+        :return: for every son, the index of the parent its first genes were copied from, and the number of genes
+        copied from that parent before the cut index or the first mutation
+        """
+        sons_cnt = len(sons)
+        rng = self.random.reproduction
+        with self.phase('selection'):
+            parents = self.selection.select(self.cur_gen_fitness, (sons_cnt, 2), rng)
+
+        with self.phase('crossover'):
+            should_recombine = rng.random(sons_cnt) < RECOMBINATION_P
+            if lengths is None:
+                cutidx = np.where(should_recombine, rng.integers(0, self.chromosome_len, sons_cnt), 0)
+            else:
+                # genes are aligned by their position in the path, so the cut is within both parents
+                shorter = self.cur_gen_lengths[parents].min(axis=1)
+                cutidx = np.where(should_recombine, (rng.random(sons_cnt) * shorter).astype(int), 0)
+            son_index = rng.integers(2, size=sons_cnt)
+
+            # son 1 starts with parent1 and son 2 starts with parent2, the tail comes from the other parent
+            head = np.where(son_index == 1, parents[:, 0], parents[:, 1])
+            tail = np.where(should_recombine, np.where(son_index == 1, parents[:, 1], parents[:, 0]), head)
+            np.take(self.cur_gen_codes, tail, axis=0, out=sons)
+            np.copyto(sons, self.cur_gen_codes[head], where=np.arange(self.chromosome_len) < cutidx[:, None])
+            if lengths is not None:
+                # a son is as long as the parent of its tail
+                np.take(self.cur_gen_lengths, tail, out=lengths)
+
+        with self.phase('mutation'):
+            should_mutate = rng.random(sons.shape) < MUTATION_P
+            sons[should_mutate] = rng.integers(len(self.Directions), size=np.count_nonzero(should_mutate),
+                                               dtype=np.uint8)
+
+            first_mutation = np.where(should_mutate.any(axis=1), should_mutate.argmax(axis=1), self.chromosome_len)
+            prefix_len = np.minimum(np.where(should_recombine, cutidx, self.chromosome_len), first_mutation)
+            if lengths is not None:
+                # a son grows or shrinks, a grown son walks the random genes that were after its length
+                resize = rng.random(sons_cnt) < LENGTH_MUTATION_P
+                delta = rng.integers(-LENGTH_MUTATION_STEP, LENGTH_MUTATION_STEP + 1, sons_cnt)
+                np.clip(lengths + resize * delta, self.min_chromosome_len, self.chromosome_len, out=lengths)
+                # the walk of the head parent only covers its own genes
+                prefix_len = np.minimum(prefix_len, np.minimum(lengths, self.cur_gen_lengths[head]))
+        return head, prefix_len
 
     def new_generation(self):
         """
@@ -228,16 +810,61 @@ class GeneticAlg:
         :return: 
         """
         self.cur_generation += 1
-        elitism = zip(self.cur_gen_fitness[:], self.cur_gen_population[:])
-        ig = operator.itemgetter(0)
-        elitism = sorted(elitism, key=ig, reverse=True)
-        next_gen_population = [zipped_item[1] for zipped_item in elitism[0:self.elitism_cnt]]
+        next_gen_codes = self.next_gen_codes
+        if self.elitism_cnt > 0:
+            with self.phase('elitism'):
+                elitism = np.argpartition(self.cur_gen_fitness, -self.elitism_cnt)[-self.elitism_cnt:]
+                next_gen_codes[:self.elitism_cnt] = self.cur_gen_codes[elitism]
+                if self.cur_gen_lengths is not None:
+                    self.next_gen_lengths[:self.elitism_cnt] = self.cur_gen_lengths[elitism]
 
         # mutate new chromosomes to next generation population
-        while len(next_gen_population) < self.population_size:
-            chromosome = self.generate_chromosome(self.cur_gen_fitness)
-            chromosome = self.mutate_chromosome(chromosome)
-            next_gen_population.append(chromosome)
+        next_gen_lengths = self.next_gen_lengths
+        head, prefix_len = self.reproduce(next_gen_codes[self.elitism_cnt:],
+                                          None if next_gen_lengths is None else next_gen_lengths[self.elitism_cnt:])
+        # a resumed walk doesn't know how long its robot has been stalled, so dead end stops disable resuming.
+        # the parents' walks are only known once their generation was evaluated, not in a restored generation
+        if self.fitness_cache is not None and self.stall_limit is None and self.cur_gen_keys is not None:
+            parents = np.full(self.population_size, -1)
+            parents[self.elitism_cnt:] = head
+            self.lineage = (parents, np.concatenate([np.zeros(self.elitism_cnt, dtype=int), prefix_len]))
+            self.parent_keys = self.cur_gen_keys
 
-        self.cur_gen_population = next_gen_population
+        self.next_gen_codes = self.cur_gen_codes
+        self.cur_gen_codes = next_gen_codes
+        if next_gen_lengths is not None:
+            self.next_gen_lengths = self.cur_gen_lengths
+            self.cur_gen_lengths = next_gen_lengths
         self.update_statistics(self.fitness())
+        if self.checkpointer is not None:
+            self.checkpointer.update(self)
+
+    def replace_worst(self, codes, lengths=None):
+        """
+        replace the chromosomes with the lowest fitness in the current generation, e.g. with migrants
+        from another population, and evaluate the generation again. the statistics of the current generation
+        are replaced by the statistics of the new population
+        :param codes: integer array of direction indices in the shape (chromosomes count, chromosome length)
+        :param lengths: length of every chromosome for variable length chromosomes, by default chromosome_len
+        :return:
+        """
+        if len(codes) == 0:
+            return
+        worst = np.argpartition(self.cur_gen_fitness, len(codes) - 1)[:len(codes)]
+        self.cur_gen_codes[worst] = codes
+        if self.cur_gen_lengths is not None:
+            self.cur_gen_lengths[worst] = self.chromosome_len if lengths is None else lengths
+        # the replaced rows don't share a prefix with the parents of this generation any more
+        self.lineage = None
+        for history in (self.best_fitness, self.worst_fitness, self.average_fitness):
+            del history[-1:]
+        self.update_statistics(self.fitness())
+
+    def close(self):
+        """
+        release the worker processes of the 'process' backend
+        :return:
+        """
+        if self.evaluator is not None:
+            self.evaluator.close()
+            self.evaluator = None
@@ -1,17 +1,38 @@
-from tkinter import *
-
 CELL_HEIGHT_REGULAR = 20
 CELL_HEIGHT_COMPACT = 10
 CELL_WIDTH_REGULAR = 20
 CELL_WIDTH_COMPACT = 10
 
+# boards larger than this are drawn as a single raster image instead of a canvas rectangle per cell
+RASTER_BOARD_SIZE = 50
+
+# cell colours. the raster image only accepts colours without spaces, so hex values are used
+EMPTY_COLOUR = "#ffffff"
+OBSTACLE_COLOUR = "#000000"
+PATH_COLOUR = "#d3d3d3"
+SOURCE_COLOUR = "#00ffff"
+DEST_COLOUR = "#90ee90"
+GRID_LINE_COLOUR = "#a0a0a0"
+
 
 class RobotGrid:
-    def __init__(self, board_frame, board_size=10, source=(0, 0), dest=(9, 9), genetic_alg=None):
+    def __init__(self, board_frame, board_size=10, source=(0, 0), dest=(9, 9), genetic_alg=None, raster=None):
+        """
+        :param board_frame: tk frame the board is drawn in
+        :param board_size: size of 2d grid
+        :param source: starting (x,y) position
+        :param dest: target (x,y) position
+        :param genetic_alg: optional GeneticAlg object for the initial best and worst positions
+        :param raster: draw the cells as a single image, by default only for boards larger than RASTER_BOARD_SIZE
+        """
+        # tkinter is only imported when a board is drawn, so the module can be imported without it
+        from tkinter import Canvas, Scrollbar, HORIZONTAL, VERTICAL, LEFT, TOP, X, Y
+
         self.rows = board_size
         self.columns = board_size
         self.source = source
         self.destination = dest
+        self.raster = board_size > RASTER_BOARD_SIZE if raster is None else raster
 
         self.cell_height = CELL_HEIGHT_REGULAR if board_size <= 10 else CELL_HEIGHT_COMPACT
         self.cell_width = CELL_WIDTH_REGULAR if board_size <= 10 else CELL_WIDTH_COMPACT
@@ -33,15 +54,37 @@ class RobotGrid:
         self.rectangles = []
         self.prop_text = []
 
+        # raster mode: one pixel per cell image, shown zoomed to the cell size, and movable labels
+        self.cells_image = None
+        self.board_image = None
+        self.raster_dirty = False
+        self.labels = {}
+
+        # cells currently coloured as the best path, so each update only touches the cells that changed
+        self.drawn_path = set()
+        self.obstacles_drawn = False
+
         self.best = genetic_alg.cur_best_location if genetic_alg is not None else source
         self.worst = genetic_alg.cur_worst_location if genetic_alg is not None else dest
 
     def update(self, genetic_alg):
         """
-
-        :param genetic_alg:
+        redraw the parts of the board that changed since the last update
+        :param genetic_alg: GeneticAlg object, or any object with the same best/worst location, path and obstacles
         :return:
         """
+        if self.raster:
+            self.update_labels(genetic_alg)
+        else:
+            self.update_text(genetic_alg)
+        # colour obstacles in black
+        self.draw_obstacles(genetic_alg)
+        # colour best path in gray, and reset cells that left it
+        self.draw_best_path(genetic_alg)
+        if self.raster:
+            self.refresh_raster()
+
+    def update_text(self, genetic_alg):
         bold_ = ("Calibri", 8, "bold")
         self.canvas.itemconfig(self.prop_text[self.source[0]][self.source[1]], text="S", font=bold_, fill="black")
         self.canvas.itemconfig(self.prop_text[self.destination[0]][self.destination[1]], text="D", font=bold_, fill="black")
@@ -62,35 +105,80 @@ class RobotGrid:
         else:
             self.canvas.itemconfig(self.prop_text[self.worst[0]][self.worst[1]], text="Worst",
                                font=bold_, fill="red")
-        # colour obstacles in black
-        self.draw_obstacles(genetic_alg)
-        # reset previous path colours:
-        self.reset_fill_colours(genetic_alg)
-        # colour best path in gray
-        self.draw_best_path(genetic_alg)
+
+    def update_labels(self, genetic_alg):
+        """
+        raster mode version of update_text, the best and worst labels are moved instead of re-texted
+        :param genetic_alg:
+        :return:
+        """
+        self.best = genetic_alg.cur_best_location
+        self.worst = genetic_alg.cur_worst_location
+        self.canvas.coords(self.labels['best'], *self.cell_centre(self.best))
+        self.canvas.coords(self.labels['worst'], *self.cell_centre(self.worst))
+        if self.worst == self.best:
+            self.canvas.itemconfig(self.labels['best'], text="")
+            self.canvas.itemconfig(self.labels['worst'], text="B/W", fill="blue")
+        else:
+            self.canvas.itemconfig(self.labels['best'], text="Best")
+            self.canvas.itemconfig(self.labels['worst'], text="Worst", fill="red")
+
+    def cell_centre(self, position):
+        return (position[1] + 1.5) * self.cell_width, (position[0] + 1.5) * self.cell_height
+
+    def fill_cell(self, position, colour):
+        """
+        colour a single cell
+        :param position: (x,y) position on the board
+        :param colour: hex colour
+        :return:
+        """
+        if self.raster:
+            self.cells_image.put(colour, to=(position[1], position[0], position[1] + 1, position[0] + 1))
+            self.raster_dirty = True
+        else:
+            self.canvas.itemconfig(self.rectangles[position[0]][position[1]], fill=colour)
+
+    def refresh_raster(self):
+        """
+        show the changes of the one pixel per cell image in the zoomed board image, in a single copy
+        :return:
+        """
+        if self.raster_dirty:
+            self.board_image.tk.call(self.board_image, 'copy', self.cells_image,
+                                     '-zoom', self.cell_width, self.cell_height)
+            self.raster_dirty = False
 
     def draw_obstacles(self, genetic_alg):
-        if genetic_alg.obstacles_len > 0 and genetic_alg.cur_generation < 1:
-            # print("Obstacles:")
-            # print(genetic_alg.obstacles)
+        if genetic_alg.obstacles_len > 0 and not self.obstacles_drawn:
             for obstacle in genetic_alg.obstacles:
-                self.canvas.itemconfig(self.rectangles[obstacle[0]][obstacle[1]], fill="black")
+                self.fill_cell(obstacle, OBSTACLE_COLOUR)
+        self.obstacles_drawn = True
 
     def draw_best_path(self, genetic_alg):
-        for step in genetic_alg.cur_best_path:
-            if genetic_alg.src != step and genetic_alg.dst != step:
-                self.canvas.itemconfig(self.rectangles[step[0]][step[1]], fill="light grey")
-
-    def reset_fill_colours(self, genetic_alg):
-        for cur in genetic_alg.prev_best_path:
-            if genetic_alg.src != cur and genetic_alg.dst != cur:
-                self.canvas.itemconfig(self.rectangles[cur[0]][cur[1]], fill="white")
+        """
+        colour the current best path, only the cells that joined or left the path since the last update are changed
+        :param genetic_alg:
+        :return:
+        """
+        best_path = set(genetic_alg.cur_best_path)
+        best_path.discard(genetic_alg.src)
+        best_path.discard(genetic_alg.dst)
+        for cur in self.drawn_path - best_path:
+            self.fill_cell(cur, EMPTY_COLOUR)
+        for step in best_path - self.drawn_path:
+            self.fill_cell(step, PATH_COLOUR)
+        self.drawn_path = best_path
 
     def draw(self):
         """
         creates the board on which the robot will move around
         :return:
         """
+        if self.raster:
+            self.draw_raster()
+            return
+
         x = self.cell_height
         y = self.cell_width
         prop_text = []
@@ -124,3 +212,40 @@ class RobotGrid:
         self.canvas.itemconfig(prop_text[self.destination[0]][self.destination[1]], text="D", font=bold_)
         self.rectangles = rectangles[:]
         self.prop_text = prop_text[:]
+
+    def draw_raster(self):
+        """
+        creates the board as a single image with one pixel per cell, zoomed to the cell size, and grid lines.
+        only the row and column numbers and the S, D, best and worst labels are separate canvas items
+        :return:
+        """
+        from tkinter import PhotoImage, NW
+
+        width = self.columns * self.cell_width
+        height = self.rows * self.cell_height
+        self.cells_image = PhotoImage(master=self.canvas, width=self.columns, height=self.rows)
+        self.cells_image.put(EMPTY_COLOUR, to=(0, 0, self.columns, self.rows))
+        self.board_image = PhotoImage(master=self.canvas, width=width, height=height)
+        self.canvas.create_image(self.cell_width, self.cell_height, image=self.board_image, anchor=NW)
+
+        regular_ = ("Calibri", 7, "bold")
+        for row in range(self.rows + 1):
+            y = (row + 1) * self.cell_height
+            self.canvas.create_line(self.cell_width, y, self.cell_width + width, y, fill=GRID_LINE_COLOUR)
+        for col in range(self.columns + 1):
+            x = (col + 1) * self.cell_width
+            self.canvas.create_line(x, self.cell_height, x, self.cell_height + height, fill=GRID_LINE_COLOUR)
+        for i in range(self.rows):
+            self.canvas.create_text(self.cell_width / 2, (i + 1.5) * self.cell_height, text=str(i), font=regular_)
+            self.canvas.create_text((i + 1.5) * self.cell_width, self.cell_height / 2, text=str(i), font=regular_)
+
+        self.fill_cell(self.source, SOURCE_COLOUR)
+        self.fill_cell(self.destination, DEST_COLOUR)
+        bold_ = ("Calibri", 8, "bold")
+        self.canvas.create_text(*self.cell_centre(self.source), text="S", font=bold_)
+        self.canvas.create_text(*self.cell_centre(self.destination), text="D", font=bold_)
+        self.labels['best'] = self.canvas.create_text(*self.cell_centre(self.best), text="Best", font=bold_,
+                                                      fill="green")
+        self.labels['worst'] = self.canvas.create_text(*self.cell_centre(self.worst), text="Worst", font=bold_,
+                                                       fill="red")
+        self.refresh_raster()
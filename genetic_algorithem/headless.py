@@ -0,0 +1,249 @@
+"""
+headless batch runner for the genetic algorithm, no tkinter is required.
+run from the repository root, for example:
+    python -m genetic_algorithem.headless --board-size 100 --population 60 --obstacles 20 --seed 7
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+
+from genetic_algorithem.checkpoint import Checkpointer, DEFAULT_CHECKPOINT_EVERY, load_meta, restore
+from genetic_algorithem.genetic_alg import GeneticAlg, MAX_GENERATIONS, MAX_GENERATIONS_LARGE_BOARD, \
+    FITNESS_BACKENDS, OUTPUTS_DIR
+from genetic_algorithem.profiling import PhaseProfiler, cprofile
+from genetic_algorithem.rng import RandomStreams
+from genetic_algorithem.seeding import SEEDING_STRATEGIES
+from genetic_algorithem.selection import SELECTION_METHODS
+from genetic_algorithem.stats import StatsRecorder
+from genetic_algorithem.termination import default_termination
+from genetic_algorithem.tracing import TraceSink, configure_logging
+
+DEFAULT_SUMMARY_FILE = os.path.join(OUTPUTS_DIR, 'headless_runs.jsonl')
+
+
+def run(board_size, pop_size, obstacles_share=0, max_generations=None, seed=None, src=None, dst=None,
+        backend='numpy', trace=None, cache_size=0, recorder=None, profiler=None, chromosome_len=None,
+        variable_length=False, stall_limit=None, seed_fraction=0, seed_strategies=None, termination=None,
+        checkpointer=None, resume=None, selection=None):
+    """
+    execute a single genetic algorithm run, creating new generations until the best path is optimal
+    or the generations limit is reached.
+    :param board_size: size of 2d grid
+    :param pop_size: size of population
+    :param obstacles_share: share of obstacle squares in the grid, between 0 and 1
+    :param max_generations: generations limit, by default the same limit used by the GUI for this board size
+    :param seed: root seed of the run random streams, None for a random run. the summary records the seed
+    that was used, also for random runs, so any run can be repeated
+    :param src: starting (x,y) position, random if not given
+    :param dst: target (x,y) position, random if not given
+    :param backend: fitness evaluation backend
+    :param trace: optional tracing.TraceSink that receives every generation
+    :param cache_size: fitness cache size, 0 to disable the cache. the cache makes runs slower, see fitness_cache
+    :param recorder: optional stats.StatsRecorder, when given the in-memory fitness lists only keep the
+    recorder capacity, so memory doesn't grow with the number of generations
+    :param profiler: optional profiling.PhaseProfiler, its report is added to the summary
+    :param chromosome_len: chromosome length, or the longest chromosome with variable_length
+    :param variable_length: evolve the chromosome lengths, see GeneticAlg
+    :param stall_limit: stop walks after this many consecutive moves into walls or obstacles
+    :param seed_fraction: share of the initial population created by path heuristics
+    :param seed_strategies: heuristics of the seeded chromosomes, see seeding.SEEDING_STRATEGIES
+    :param termination: termination.Termination of the run, by default the optimal path, reachability and
+    max_generations policies
+    :param checkpointer: optional checkpoint.Checkpointer, the last generation is always saved
+    :param resume: checkpoint file to continue from. the grid, population, seed and chromosome parameters come
+    from the checkpoint, the given ones are ignored
+    :param selection: parent selection method, one of selection.SELECTION_METHODS, by default roulette, or the
+    method of the resume checkpoint
+    :return: run summary dictionary
+    """
+    start = time.perf_counter()
+    history_len = recorder.capacity if recorder is not None else None
+    if resume is not None:
+        genetic_alg = restore(resume, trace=trace, recorder=recorder, checkpointer=checkpointer, backend=backend,
+                              cache_size=cache_size, history_len=history_len, profiler=profiler, selection=selection)
+        board_size, pop_size = genetic_alg.grid_size, genetic_alg.population_size
+        obstacles_share = None
+    else:
+        streams = RandomStreams(seed)
+        if src is None:
+            src = streams.random_cell(board_size)
+        if dst is None:
+            dst = streams.random_cell(board_size)
+        genetic_alg = GeneticAlg(pop_size, board_size, tuple(src), tuple(dst), obstacles_share, backend=backend,
+                                 trace=trace, cache_size=cache_size, recorder=recorder, history_len=history_len,
+                                 rng=streams, profiler=profiler, chromosome_len=chromosome_len,
+                                 variable_length=variable_length, stall_limit=stall_limit,
+                                 seed_fraction=seed_fraction, seed_strategies=seed_strategies,
+                                 checkpointer=checkpointer, selection=selection)
+    if max_generations is None:
+        max_generations = MAX_GENERATIONS if board_size <= 10 else MAX_GENERATIONS_LARGE_BOARD
+    if termination is None:
+        termination = default_termination(max_generations)
+    termination.run(genetic_alg)
+    if checkpointer is not None:
+        checkpointer.save(genetic_alg)
+    wall_time = time.perf_counter() - start
+    genetic_alg.close()
+
+    summary = {
+        'board_size': board_size,
+        'population': pop_size,
+        'obstacles_share': obstacles_share,
+        'seed': genetic_alg.random.seed,
+        'backend': backend,
+        'chromosome_len': genetic_alg.chromosome_len,
+        'variable_length': genetic_alg.cur_gen_lengths is not None,
+        'stall_limit': genetic_alg.stall_limit,
+        'seed_fraction': seed_fraction,
+        'selection': genetic_alg.selection.name,
+        'src': list(genetic_alg.src),
+        'dst': list(genetic_alg.dst),
+        'obstacles': genetic_alg.obstacles_len,
+        'generations': genetic_alg.cur_generation,
+        'max_generations': max_generations,
+        'is_optimal': genetic_alg.is_optimal,
+        'stop_reason': genetic_alg.stop_reason,
+        'best_fitness': genetic_alg.best_fitness[-1],
+        'worst_fitness': genetic_alg.worst_fitness[-1],
+        'average_fitness': float(genetic_alg.average_fitness[-1]),
+        'best_length': genetic_alg.cur_best_length,
+        'best_distance': genetic_alg.cur_best_distance,
+        'best_possible_len': genetic_alg.best_possible_len,
+        'wall_time': wall_time,
+    }
+    if genetic_alg.fitness_cache is not None:
+        summary['fitness_cache'] = genetic_alg.fitness_cache.stats()
+    if profiler is not None:
+        summary['profile'] = profiler.report()
+    if checkpointer is not None:
+        summary['checkpoint'] = checkpointer.path
+    if resume is not None:
+        summary['resumed_from'] = resume
+    return summary
+
+
+def write_summary(summary, path):
+    """
+    append a run summary as a single json line
+    :param summary: run summary dictionary
+    :param path: output file
+    :return:
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a') as summary_file:
+        summary_file.write(json.dumps(summary) + '\n')
+
+
+def positive_int(value):
+    """
+    argparse type of options that must be a positive integer
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer: " + value)
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the robot path genetic algorithm without a GUI")
+    parser.add_argument('--board-size', type=int, default=10, help="size of the 2d grid")
+    parser.add_argument('--population', type=int, default=20, help="population size")
+    parser.add_argument('--obstacles', type=float, default=0, help="percent of grid squares that are obstacles")
+    parser.add_argument('--max-generations', type=int, default=None,
+                        help="generations limit (default: %d, or %d for boards larger than 10x10)"
+                             % (MAX_GENERATIONS, MAX_GENERATIONS_LARGE_BOARD))
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    parser.add_argument('--src', type=int, nargs=2, default=None, metavar=('X', 'Y'), help="starting position")
+    parser.add_argument('--dst', type=int, nargs=2, default=None, metavar=('X', 'Y'), help="target position")
+    parser.add_argument('--backend', choices=FITNESS_BACKENDS, default='numpy', help="fitness evaluation backend")
+    parser.add_argument('--chromosome-len', type=int, default=None,
+                        help="genes of a chromosome, the longest chromosome with --variable-length "
+                             "(default: 2.5 times the board size)")
+    parser.add_argument('--variable-length', action='store_true',
+                        help="evolve the chromosome lengths, starting from the distance between src and dst")
+    parser.add_argument('--stall-limit', type=positive_int, default=None,
+                        help="stop a walk after this many consecutive moves into walls or obstacles")
+    parser.add_argument('--seed-fraction', type=float, default=0,
+                        help="share of the initial population created by path heuristics instead of at random")
+    parser.add_argument('--seed-strategies', nargs='+', choices=SEEDING_STRATEGIES, default=None,
+                        help="heuristics of the seeded chromosomes (default: all)")
+    parser.add_argument('--selection', choices=SELECTION_METHODS, default=None,
+                        help="parent selection method (default: roulette, or the method of the resumed checkpoint)")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="number of chromosome walks to memoize between generations, this makes runs slower "
+                             "with the default mutation rate (default: no cache)")
+    parser.add_argument('--stagnation', type=int, default=None, metavar='GENERATIONS',
+                        help="stop when the best path didn't improve for this many generations")
+    parser.add_argument('--min-diversity', type=float, default=None,
+                        help="stop when the population gene diversity drops below this, between 0 and 1")
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help="stop after this many seconds")
+    parser.add_argument('--output', default=DEFAULT_SUMMARY_FILE, help="json lines file the run summary is appended to")
+    parser.add_argument('--trace', nargs='?', const='', default=None, metavar='DIR',
+                        help="write every generation to compressed files in DIR (default: under outputs/traces)")
+    parser.add_argument('--stats', nargs='?', const='', default=None, metavar='DIR',
+                        help="record per-generation statistics to column files in DIR (default: under outputs/stats)")
+    parser.add_argument('--profile', action='store_true', help="time every phase of a generation and count the moves")
+    parser.add_argument('--checkpoint', nargs='?', const='', default=None, metavar='FILE',
+                        help="checkpoint the run to FILE (default: under outputs/checkpoints)")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help="generations between checkpoints")
+    parser.add_argument('--resume', default=None, metavar='FILE',
+                        help="continue the run of a checkpoint, the board, population and seed options are ignored")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="profile the run with cProfile, the stats are saved next to the output file")
+    parser.add_argument('-v', '--verbose', action='count', default=0,
+                        help="log verbosity, repeat for more details (-vvv logs every chromosome)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging(args.verbose)
+    trace = TraceSink(args.trace or None) if args.trace is not None else None
+    recorder = StatsRecorder(args.stats or None) if args.stats is not None else None
+    profiler = PhaseProfiler() if args.profile else None
+    checkpointer = Checkpointer(args.checkpoint or None, args.checkpoint_every) if args.checkpoint is not None else None
+    board_size = load_meta(args.resume)['grid_size'] if args.resume is not None else args.board_size
+    max_generations = args.max_generations
+    if max_generations is None:
+        max_generations = MAX_GENERATIONS if board_size <= 10 else MAX_GENERATIONS_LARGE_BOARD
+    termination = default_termination(max_generations, args.stagnation, args.min_diversity, args.time_budget)
+    if args.cprofile:
+        profile_path = os.path.join(os.path.dirname(os.path.abspath(args.output)),
+                                    time.strftime('profile_%Y%m%d_%H%M%S.prof'))
+        os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+        run_context = cprofile(profile_path)
+    else:
+        profile_path = None
+        run_context = contextlib.nullcontext()
+    try:
+        with run_context:
+            summary = run(args.board_size, args.population, args.obstacles / 100, args.max_generations, args.seed,
+                          args.src, args.dst, args.backend, trace, args.cache_size, recorder, profiler,
+                          args.chromosome_len, args.variable_length, args.stall_limit, args.seed_fraction,
+                          args.seed_strategies, termination, checkpointer, args.resume, args.selection)
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        if trace is not None:
+            trace.close()
+        if recorder is not None:
+            recorder.close()
+    write_summary(summary, args.output)
+    print("Generations: {generations}/{max_generations}, stopped: {stop_reason}, best length: {best_length} "
+          "(best possible: {best_possible_len}), best distance: {best_distance}, "
+          "wall time: {wall_time:.3f}s".format(**summary))
+    if profiler is not None:
+        print(profiler.format_report())
+    if profile_path is not None:
+        print("cProfile stats saved to " + profile_path)
+    return summary
+
+
+if __name__ == '__main__':
+    main()
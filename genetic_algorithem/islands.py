@@ -0,0 +1,262 @@
+"""
+island model: several independent GeneticAlg populations evolve in separate processes on the same grid, source and
+destination. every migration interval each island publishes its best chromosomes in a shared memory block, and
+replaces its worst chromosomes with the migrants of another island, chosen by a ring or a random topology.
+the run stops as soon as one of the islands finds an optimal path.
+run from the repository root, for example:
+    python -m genetic_algorithem.islands --islands 4 --board-size 100 --population 60 --obstacles 20 --seed 7
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, MAX_GENERATIONS, MAX_GENERATIONS_LARGE_BOARD, \
+    FITNESS_BACKENDS, OUTPUTS_DIR, draw_obstacles
+from genetic_algorithem.headless import write_summary
+from genetic_algorithem.rng import RandomStreams
+
+TOPOLOGIES = ['ring', 'random']
+DEFAULT_MIGRATION_INTERVAL = 10
+DEFAULT_MIGRANTS = 2
+# seconds an island waits for the others at a migration, a crashed island makes the others fail instead of hanging
+BARRIER_TIMEOUT = 600
+
+DEFAULT_SUMMARY_FILE = os.path.join(OUTPUTS_DIR, 'island_runs.jsonl')
+
+
+def migration_sources(topology, islands, epoch, seed):
+    """
+    the island every island receives migrants from in a migration
+    :param topology: 'ring' receives from the previous island, 'random' from the previous island of a random ring
+    that changes every migration. all islands compute the same random ring from the seed and the migration index
+    :param islands: number of islands
+    :param epoch: migration index
+    :param seed: root entropy of the run
+    :return: array of source island indices
+    """
+    order = np.arange(islands)
+    if topology == 'random':
+        order = np.random.default_rng([epoch, seed]).permutation(islands)
+    sources = np.empty(islands, dtype=int)
+    sources[order] = np.roll(order, 1)
+    return sources
+
+
+class SharedMigration:
+    def __init__(self, islands, migrants, chromosome_len, name=None):
+        """
+        shared memory block of the migrants of every island and of the islands that found an optimal path
+        :param islands: number of islands
+        :param migrants: chromosomes sent by every island in a migration
+        :param chromosome_len: chromosome length
+        :param name: name of an existing block to attach to, None to create a new one
+        """
+        self.shape = (islands, migrants, chromosome_len)
+        size = islands * migrants * chromosome_len + islands
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.migrants = np.ndarray(self.shape, dtype=np.uint8, buffer=self.memory.buf)
+        self.optimal = np.ndarray(islands, dtype=np.uint8, buffer=self.memory.buf, offset=size - islands)
+
+    def close(self):
+        del self.migrants, self.optimal
+        self.memory.close()
+
+
+def run_island(index, config, seed_sequence, memory_name, barrier, results):
+    """
+    evolve a single island, runs in a worker process
+    :param index: island index
+    :param config: dictionary of the run parameters, see run
+    :param seed_sequence: np.random.SeedSequence of the island random streams
+    :param memory_name: name of the SharedMigration block
+    :param barrier: multiprocessing barrier of all islands
+    :param results: queue the island summary is put on
+    :return:
+    """
+    genetic_alg = GeneticAlg(config['pop_size'], config['board_size'], config['src'], config['dst'],
+                             backend=config['backend'], rng=RandomStreams(seed_sequence),
+                             obstacles=config['obstacles'])
+    shared = SharedMigration(config['islands'], config['migrants'], genetic_alg.chromosome_len, memory_name)
+    migrants = config['migrants']
+    epoch = 0
+    try:
+        while True:
+            # evolve until the next migration, or until any island is optimal
+            for i in range(config['migration_interval']):
+                if genetic_alg.is_optimal or shared.optimal.any() or \
+                        genetic_alg.cur_generation >= config['max_generations']:
+                    break
+                genetic_alg.new_generation()
+            shared.optimal[index] = genetic_alg.is_optimal
+            best = np.argpartition(genetic_alg.cur_gen_fitness, -migrants)[-migrants:]
+            shared.migrants[index] = genetic_alg.cur_gen_codes[best]
+            barrier.wait(BARRIER_TIMEOUT)
+
+            # every island sees the same flags after the barrier, so all of them stop at the same migration
+            if shared.optimal.any() or genetic_alg.cur_generation >= config['max_generations']:
+                break
+            source = migration_sources(config['topology'], config['islands'], epoch, config['seed'])[index]
+            genetic_alg.replace_worst(shared.migrants[source].copy())
+            epoch += 1
+            # nobody publishes new migrants before all islands took theirs
+            barrier.wait(BARRIER_TIMEOUT)
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        shared.close()
+        genetic_alg.close()
+
+    results.put({
+        'island': index,
+        'generations': genetic_alg.cur_generation,
+        'migrations': epoch,
+        'is_optimal': genetic_alg.is_optimal,
+        'best_fitness': genetic_alg.best_fitness[-1],
+        'best_length': genetic_alg.cur_best_length,
+        'best_distance': genetic_alg.cur_best_distance,
+        'best_possible_len': genetic_alg.best_possible_len,
+    })
+
+
+def run(islands, board_size, pop_size, obstacles_share=0, max_generations=None, seed=None, src=None, dst=None,
+        backend='numpy', migration_interval=DEFAULT_MIGRATION_INTERVAL, migrants=DEFAULT_MIGRANTS, topology='ring'):
+    """
+    execute an island model run
+    :param islands: number of islands, each one runs in its own process
+    :param board_size: size of 2d grid
+    :param pop_size: population size of every island
+    :param obstacles_share: share of obstacle squares in the grid, between 0 and 1
+    :param max_generations: generations limit, by default the same limit used by the GUI for this board size
+    :param seed: root seed, every island draws from its own spawned streams. None for a random run
+    :param src: starting (x,y) position, random if not given
+    :param dst: target (x,y) position, random if not given
+    :param backend: fitness evaluation backend of every island
+    :param migration_interval: generations between migrations
+    :param migrants: chromosomes every island sends in a migration
+    :param topology: one of TOPOLOGIES
+    :return: run summary dictionary
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError("Unknown topology: " + str(topology))
+    if not 0 < migrants < pop_size:
+        raise ValueError("migrants must be positive and smaller than the population size")
+    if max_generations is None:
+        max_generations = MAX_GENERATIONS if board_size <= 10 else MAX_GENERATIONS_LARGE_BOARD
+    streams = RandomStreams(seed)
+    src = tuple(src) if src is not None else streams.random_cell(board_size)
+    dst = tuple(dst) if dst is not None else streams.random_cell(board_size)
+    config = {
+        'islands': islands,
+        'board_size': board_size,
+        'pop_size': pop_size,
+        'src': src,
+        'dst': dst,
+        'obstacles': draw_obstacles(streams.obstacles, board_size, obstacles_share),
+        'max_generations': max_generations,
+        'backend': backend,
+        'migration_interval': migration_interval,
+        'migrants': migrants,
+        'topology': topology,
+        'seed': streams.seed,
+    }
+
+    shared = SharedMigration(islands, migrants, int(2.5 * board_size))
+    barrier = multiprocessing.Barrier(islands)
+    results = multiprocessing.Queue()
+    island_seeds = streams.seed_sequence.spawn(islands)
+    processes = [multiprocessing.Process(target=run_island,
+                                         args=(i, config, island_seeds[i], shared.memory.name, barrier, results))
+                 for i in range(islands)]
+    start = time.perf_counter()
+    try:
+        for process in processes:
+            process.start()
+        island_results = []
+        while len(island_results) < islands:
+            try:
+                island_results.append(results.get(timeout=1))
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("an island process failed")
+        wall_time = time.perf_counter() - start
+    finally:
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        shared.close()
+        shared.memory.unlink()
+
+    island_results.sort(key=lambda result: result['island'])
+    # best_fitness is relative to the population of its own island, the islands are compared by the unnormalized
+    # fitness 3 * distance + length
+    best = min(island_results, key=lambda result: 3 * result['best_distance'] + result['best_length'])
+    return {
+        'islands': islands,
+        'board_size': board_size,
+        'population': pop_size,
+        'obstacles_share': obstacles_share,
+        'seed': streams.seed,
+        'backend': backend,
+        'topology': topology,
+        'migration_interval': migration_interval,
+        'migrants': migrants,
+        'src': list(src),
+        'dst': list(dst),
+        'obstacles': len(set(config['obstacles']) - {src, dst}),
+        'generations': max(result['generations'] for result in island_results),
+        'max_generations': max_generations,
+        'is_optimal': any(result['is_optimal'] for result in island_results),
+        'best_island': best['island'],
+        'best_length': best['best_length'],
+        'best_distance': best['best_distance'],
+        'best_possible_len': best['best_possible_len'],
+        'wall_time': wall_time,
+        'island_results': island_results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the robot path genetic algorithm as an island model")
+    parser.add_argument('--islands', type=int, default=os.cpu_count(), help="number of islands (default: CPUs)")
+    parser.add_argument('--board-size', type=int, default=100, help="size of the 2d grid")
+    parser.add_argument('--population', type=int, default=60, help="population size of every island")
+    parser.add_argument('--obstacles', type=float, default=0, help="percent of grid squares that are obstacles")
+    parser.add_argument('--max-generations', type=int, default=None,
+                        help="generations limit (default: %d, or %d for boards larger than 10x10)"
+                             % (MAX_GENERATIONS, MAX_GENERATIONS_LARGE_BOARD))
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    parser.add_argument('--src', type=int, nargs=2, default=None, metavar=('X', 'Y'), help="starting position")
+    parser.add_argument('--dst', type=int, nargs=2, default=None, metavar=('X', 'Y'), help="target position")
+    parser.add_argument('--backend', choices=FITNESS_BACKENDS, default='numpy', help="fitness evaluation backend")
+    parser.add_argument('--migration-interval', type=int, default=DEFAULT_MIGRATION_INTERVAL,
+                        help="generations between migrations")
+    parser.add_argument('--migrants', type=int, default=DEFAULT_MIGRANTS,
+                        help="chromosomes every island sends in a migration")
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='ring', help="migration topology")
+    parser.add_argument('--output', default=DEFAULT_SUMMARY_FILE, help="json lines file the run summary is appended to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = run(args.islands, args.board_size, args.population, args.obstacles / 100, args.max_generations,
+                  args.seed, args.src, args.dst, args.backend, args.migration_interval, args.migrants, args.topology)
+    write_summary(summary, args.output)
+    print("Islands: {islands}, generations: {generations}/{max_generations}, optimal: {is_optimal}, "
+          "best length: {best_length} (island {best_island}), best distance: {best_distance}, "
+          "best possible: {best_possible_len}, wall time: {wall_time:.3f}s".format(**summary))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,86 @@
+from genetic_algorithem.checkpoint import Checkpointer
 from genetic_algorithem.grid import *
 from genetic_algorithem.genetic_alg import *
+from genetic_algorithem.rng import RandomStreams
+from genetic_algorithem.tracing import configure_logging
+from genetic_algorithem.worker import GeneticAlgWorker
 
 from tkinter import *
-import matplotlib.pyplot as plt
-import random
 import numpy as np
 
 # set program parameters
-MAX_GENERATIONS = 300
-MAX_GENERATIONS_LARGE_BOARD = 500
 BOLD = "Verdana 8 bold"
+# the board is redrawn at this rate while the genetic algorithm runs on a worker thread
+FRAME_INTERVAL_MS = 40
 
 initialized = False
 running = False
-
-root = Tk()
-root.title("Robot movement")
-
-source_var = StringVar()
-dest_var = StringVar()
-generation_var = StringVar()
-best_path_len_var = StringVar()
-best_path_dist_var = StringVar()
-worst_path_len_var = StringVar()
-worst_path_dist_var = StringVar()
-best_possible_length_var = StringVar()
-
-# initializing the choice, i.e. the default size of the board is 10 * 10. size tested are 10 and 100
-board_size = IntVar()
-board_size.set(10)
+worker = None
+drawn_generation = -1
+# every run of the session is checkpointed to the same file, the last run started is the one that is kept
+checkpointer = None
+
+# the window and its variables are created by main, importing this module doesn't open a window
+root = None
+source_var = None
+dest_var = None
+generation_var = None
+best_path_len_var = None
+best_path_dist_var = None
+worst_path_len_var = None
+worst_path_dist_var = None
+best_possible_length_var = None
+board_size = None
+pop_size = None
+obstacles_percent = None
 size_radio_buttons = []
-
-# initializing the population size, i.e. the default size of the board is 10 * 10. population size tested is 20,40,60
-pop_size = IntVar()
-pop_size.set(20)
 population_radio_buttons = []
-
-# set % of board squares that are obstacles. can be 0 for no obstacles grid
-obstacles_percent = IntVar()
-obstacles_percent.set(0)
 obstacles_percent_radio_buttons = []
 
+
+def init_variables():
+    """
+    create the main window and the variables of the GUI labels and options
+    :return:
+    """
+    global root, source_var, dest_var, generation_var, best_path_len_var, best_path_dist_var, worst_path_len_var, \
+        worst_path_dist_var, best_possible_length_var, board_size, pop_size, obstacles_percent
+    root = Tk()
+    root.title("Robot movement")
+
+    source_var = StringVar()
+    dest_var = StringVar()
+    generation_var = StringVar()
+    best_path_len_var = StringVar()
+    best_path_dist_var = StringVar()
+    worst_path_len_var = StringVar()
+    worst_path_dist_var = StringVar()
+    best_possible_length_var = StringVar()
+
+    # initializing the choice, i.e. the default size of the board is 10 * 10. size tested are 10 and 100
+    board_size = IntVar()
+    board_size.set(10)
+
+    # initializing the population size, i.e. the default population is 20. population size tested is 20,40,60
+    pop_size = IntVar()
+    pop_size.set(20)
+
+    # set % of board squares that are obstacles. can be 0 for no obstacles grid
+    obstacles_percent = IntVar()
+    obstacles_percent.set(0)
+
+
 def init_genetic_alg():
     """
     initialize genetic algorithem object with defined board size, population size, obstacles and othe parameters.
     in this method, the first generation is created, starting point and target and obstacles are positioned on board.
     :return: GeneticAlg object
     """
-    source = (random.randint(0, board_size.get() - 1), random.randint(0, board_size.get() - 1))
-    dest = (random.randint(0, board_size.get() - 1), random.randint(0, board_size.get() - 1))
-    return GeneticAlg(pop_size.get(), board_size.get(), source, dest, obstacles_percent.get() / 100)
+    streams = RandomStreams()
+    source = streams.random_cell(board_size.get())
+    dest = streams.random_cell(board_size.get())
+    return GeneticAlg(pop_size.get(), board_size.get(), source, dest, obstacles_percent.get() / 100, rng=streams,
+                      checkpointer=checkpointer)
 
 
 def update_labels(genetic_alg):
@@ -68,21 +99,37 @@ def update_labels(genetic_alg):
     best_possible_length_var.set("Best possible length: " + str(genetic_alg.best_possible_len))
 
 
+def current_state():
+    """
+    the latest generation state that is safe to read from the GUI thread
+    :return: worker snapshot while a worker exists, otherwise the GeneticAlg object itself
+    """
+    return worker.snapshot() if worker is not None else genetic_alg
+
+
 def run_genetic_alg():
     """
-    executing the genetic algorithem selection process. creating a new generation
+    show the latest generation of the genetic algorithem worker. generations the worker finished
+    since the previous frame are skipped
     :return:
     """
     global running
-
-    max_generations = MAX_GENERATIONS if board_size.get() == 10 else MAX_GENERATIONS_LARGE_BOARD
-    genetic_alg.new_generation()
-    update_labels(genetic_alg)
-    robot_grid.update(genetic_alg)
-    if not genetic_alg.is_optimal and genetic_alg.cur_generation <= max_generations and running:
-        root.after(5, run_genetic_alg)
+    global drawn_generation
+
+    snapshot = worker.snapshot()
+    if snapshot.cur_generation != drawn_generation:
+        update_labels(snapshot)
+        robot_grid.update(snapshot)
+        drawn_generation = snapshot.cur_generation
+    if worker.is_alive():
+        root.after(FRAME_INTERVAL_MS, run_genetic_alg)
+    elif worker.snapshot().cur_generation != drawn_generation:
+        # the worker finished after the snapshot above was taken, show its last generation
+        root.after(0, run_genetic_alg)
     else:
         running = False
+        generation_var.set("Generation: {} ({})".format(worker.snapshot().cur_generation,
+                                                       worker.snapshot().stop_reason))
 
 # define optional commands in gui
 def start_genetic_alg():
@@ -91,7 +138,13 @@ def start_genetic_alg():
     :return:
     """
     global running
+    global worker
+    if running:
+        return
     running = True
+    max_generations = MAX_GENERATIONS if board_size.get() <= 10 else MAX_GENERATIONS_LARGE_BOARD
+    worker = GeneticAlgWorker(genetic_alg, max_generations)
+    worker.start()
     run_genetic_alg()
 
 
@@ -100,18 +153,23 @@ def stop_genetic_alg():
     interapt algorithem execution
     :return:
     """
-    global running
-    running = False
+    if worker is not None:
+        worker.stop()
 
 
 def update_size():
     global robot_grid
     global genetic_alg
+    global worker
+    global drawn_generation
     if initialized and not running:
         for widget in board_frm.winfo_children():
             widget.destroy()
 
+        genetic_alg.close()
         genetic_alg = init_genetic_alg()
+        worker = None
+        drawn_generation = -1
         robot_grid = RobotGrid(board_frm, board_size.get(), genetic_alg.src, genetic_alg.dst, genetic_alg)
         robot_grid.draw()
         robot_grid.update(genetic_alg)
@@ -132,7 +190,10 @@ def plot_stats():
 
     :return:
     """
-    global genetic_alg
+    # matplotlib takes long to import, so it is only loaded when a plot is requested
+    import matplotlib.pyplot as plt
+
+    genetic_alg = current_state()
     plt.scatter(range(0, len(genetic_alg.worst_fitness)), genetic_alg.worst_fitness, s=5, label="Worst")
     plt.scatter(range(0, len(genetic_alg.average_fitness)), genetic_alg.average_fitness, s=5, label="Average")
     plt.scatter(range(0, len(genetic_alg.best_fitness)), genetic_alg.best_fitness, s=5, label="Best")
@@ -161,7 +222,9 @@ def plot_last_generation_fitness():
     plot distribution of fitness among current generation population
     :return:
     """
-    global genetic_alg
+    import matplotlib.pyplot as plt
+
+    genetic_alg = current_state()
     plt.scatter(range(1, len(genetic_alg.cur_gen_fitness) + 1), genetic_alg.cur_gen_fitness, s=5)
     plt.grid(True)
 
@@ -299,14 +362,31 @@ def gui():
 
     initialized = True
 
-genetic_alg = init_genetic_alg()
-gui()
-robot_grid = RobotGrid(board_frm, board_size.get(), genetic_alg.src, genetic_alg.dst, genetic_alg)
 
-update_labels(genetic_alg)
-robot_grid.draw()
-robot_grid.update(genetic_alg)
+def main():
+    global genetic_alg
+    global robot_grid
+    global checkpointer
+
+    configure_logging(1)
+    init_variables()
+    checkpointer = Checkpointer()
+    genetic_alg = init_genetic_alg()
+    gui()
+    robot_grid = RobotGrid(board_frm, board_size.get(), genetic_alg.src, genetic_alg.dst, genetic_alg)
+
+    update_labels(genetic_alg)
+    robot_grid.draw()
+    robot_grid.update(genetic_alg)
+
+    root.mainloop()
+
+    # the window was closed, the worker saves its last finished generation before the program exits
+    if worker is not None:
+        worker.stop()
+        worker.join()
+    checkpointer.close()
 
-root.mainloop()
 
-print("temp")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+multi-query batch solving: many (src, dst) queries on one shared grid, e.g. routing many robots across the same
+obstacle layout. the grid is built once in a Board (occupancy bitmap, transition tables and breadth first search
+distance fields to the destinations), every query runs its own GeneticAlg on the shared board.
+queries run concurrently on a process pool. the board is sent once to every worker, and the queries are sorted by
+destination before they are split into chunks, so a worker computes the distance field of a destination once and
+reuses it for all queries of its chunk. queries with a src or dst outside the grid or on an obstacle, and queries
+whose dst can't be reached from src, are reported without running the genetic algorithm.
+run from the repository root, for example:
+    python -m genetic_algorithem.multi_query --board-size 50 --obstacles 20 --queries 1000 --seed 7
+"""
+import argparse
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import GeneticAlg, MAX_GENERATIONS_LARGE_BOARD, FITNESS_BACKENDS, \
+    OUTPUTS_DIR, bfs_distances, build_transition_tables, draw_obstacles
+from genetic_algorithem.headless import write_summary
+from genetic_algorithem.rng import RandomStreams
+from genetic_algorithem.termination import Termination, OptimalPath, GenerationLimit, Stagnation
+
+DEFAULT_CHUNK_SIZE = 16
+# distance fields kept by a board, every field is a grid_size * grid_size int32 array
+DEFAULT_MAX_FIELDS = 64
+# every query runs in a single process, the 'process' backend would start a pool per query
+QUERY_BACKENDS = tuple(backend for backend in FITNESS_BACKENDS if backend != 'process')
+
+DEFAULT_SUMMARY_FILE = os.path.join(OUTPUTS_DIR, 'multi_query_runs.jsonl')
+
+# shared board and query parameters of a worker process, set once by init_worker
+_worker_state = None
+
+
+class Board:
+    def __init__(self, grid_size, obstacles, max_fields=DEFAULT_MAX_FIELDS):
+        """
+        static grid shared by all queries
+        :param grid_size: size of 2d grid
+        :param obstacles: list of (x,y) obstacle positions
+        :param max_fields: number of distance fields kept, the least recently used one is dropped first
+        """
+        self.grid_size = grid_size
+        self.obstacles = list(dict.fromkeys(map(tuple, obstacles)))
+        self.obstacles_len = len(self.obstacles)
+        self.occupancy = np.zeros((grid_size, grid_size), dtype=bool)
+        if self.obstacles_len > 0:
+            self.occupancy[tuple(np.array(self.obstacles).T)] = True
+        self.transitions, self.step_penalties = build_transition_tables(self.occupancy)
+        self.max_fields = max_fields
+        self.distance_fields = OrderedDict()
+
+    def is_free(self, position):
+        """
+        :param position: (x,y) position
+        :return: True if the position is on the grid and isn't an obstacle
+        """
+        row, col = position
+        return 0 <= row < self.grid_size and 0 <= col < self.grid_size and not self.occupancy[row, col]
+
+    def distance_field(self, position):
+        """
+        :param position: (x,y) position
+        :return: breadth first search distance of every cell to the position, -1 for cells that can't reach it,
+        see bfs_distances. moves are symmetric on the grid, so this is also the distance from the position
+        """
+        position = tuple(position)
+        distances = self.distance_fields.get(position)
+        if distances is None:
+            distances = bfs_distances(self.transitions, position[0] * self.grid_size + position[1])
+            self.distance_fields[position] = distances
+            if len(self.distance_fields) > self.max_fields:
+                self.distance_fields.popitem(last=False)
+        else:
+            self.distance_fields.move_to_end(position)
+        return distances
+
+    def __getstate__(self):
+        # distance fields are cheap to rebuild compared to sending them to every worker
+        state = self.__dict__.copy()
+        state['distance_fields'] = OrderedDict()
+        return state
+
+
+def init_worker(board, config):
+    """
+    keep the board and the query parameters in the worker process for all following chunks
+    """
+    global _worker_state
+    _worker_state = (board, config)
+
+
+def solve_query(board, config, src, dst, seed_sequence):
+    """
+    find a path for a single query
+    :param board: Board object
+    :param config: dictionary of the query parameters, see solve_queries
+    :param src: starting (x,y) position
+    :param dst: target (x,y) position
+    :param seed_sequence: np.random.SeedSequence of the query random streams
+    :return: query result dictionary
+    """
+    start = time.perf_counter()
+    result = {
+        'src': list(src),
+        'dst': list(dst),
+        'path': [],
+        'best_length': 0,
+        'best_distance': None,
+        'shortest_len': None,
+        'is_optimal': False,
+        'generations': 0,
+        'stop_reason': None,
+    }
+    if not board.is_free(src) or not board.is_free(dst):
+        result['stop_reason'] = 'invalid'
+    else:
+        shortest_len = int(board.distance_field(dst)[src[0] * board.grid_size + src[1]])
+        result['shortest_len'] = shortest_len if shortest_len >= 0 else None
+        if shortest_len < 0:
+            result['stop_reason'] = 'unreachable'
+        elif src == dst:
+            result.update(best_distance=0, is_optimal=True, stop_reason='optimal')
+        else:
+            genetic_alg = GeneticAlg(config['pop_size'], board.grid_size, src, dst, backend=config['backend'],
+                                     rng=RandomStreams(seed_sequence), seed_fraction=config['seed_fraction'],
+                                     board=board)
+            policies = [OptimalPath(), GenerationLimit(config['max_generations'])]
+            if config['stagnation_generations'] is not None:
+                policies.append(Stagnation(config['stagnation_generations']))
+            Termination(policies).run(genetic_alg)
+            genetic_alg.close()
+            result.update(path=[list(position) for position in genetic_alg.cur_best_path],
+                          best_length=genetic_alg.cur_best_length, best_distance=genetic_alg.cur_best_distance,
+                          is_optimal=genetic_alg.is_optimal, generations=genetic_alg.cur_generation,
+                          stop_reason=genetic_alg.stop_reason)
+    result['time'] = time.perf_counter() - start
+    return result
+
+
+def solve_chunk(chunk):
+    """
+    solve a chunk of queries in a worker process
+    :param chunk: list of (query index, src, dst, seed sequence)
+    :return: list of (query index, query result)
+    """
+    board, config = _worker_state
+    return [(index, solve_query(board, config, src, dst, seed_sequence))
+            for index, src, dst, seed_sequence in chunk]
+
+
+def solve_queries(board, queries, pop_size, max_generations=MAX_GENERATIONS_LARGE_BOARD, workers=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE, seed=None, seed_fraction=0, backend='numpy',
+                  stagnation_generations=None):
+    """
+    find a path for every query on a shared board
+    :param board: Board object
+    :param queries: list of ((x,y) src, (x,y) dst) pairs
+    :param pop_size: population size of every query
+    :param max_generations: generations limit of every query
+    :param workers: number of worker processes, by default the number of CPUs. 1 solves the queries in this process
+    :param chunk_size: number of queries sent to a worker in a single task
+    :param seed: root seed, every query draws from its own spawned streams, so the result of a query doesn't depend
+    on the workers or the other queries. None for a random run
+    :param seed_fraction: share of the initial population of every query created by path heuristics
+    :param backend: fitness evaluation backend of every query, one of QUERY_BACKENDS
+    :param stagnation_generations: optional termination.Stagnation generations of every query
+    :return: list of the query results in the queries order, and a dictionary of the batch metrics
+    """
+    if backend not in QUERY_BACKENDS:
+        raise ValueError("Unknown query backend: " + str(backend))
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    workers = workers or os.cpu_count()
+    config = {
+        'pop_size': pop_size,
+        'max_generations': max_generations,
+        'seed_fraction': seed_fraction,
+        'backend': backend,
+        'stagnation_generations': stagnation_generations,
+    }
+    streams = RandomStreams(seed)
+    query_seeds = streams.seed_sequence.spawn(len(queries))
+    tasks = [(i, tuple(src), tuple(dst), query_seeds[i]) for i, (src, dst) in enumerate(queries)]
+    # queries of the same destination share a distance field, so they are kept in the same chunks
+    tasks.sort(key=lambda task: task[2])
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        init_worker(board, config)
+        chunk_results = map(solve_chunk, chunks)
+        results = dict(result for chunk_result in chunk_results for result in chunk_result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(board, config)) as executor:
+            results = dict(result for chunk_result in executor.map(solve_chunk, chunks)
+                           for result in chunk_result)
+    wall_time = time.perf_counter() - start
+
+    results = [results[i] for i in range(len(queries))]
+    solved = [result for result in results if result['stop_reason'] not in ('invalid', 'unreachable')]
+    metrics = {
+        'queries': len(queries),
+        'seed': streams.seed,
+        'workers': workers,
+        'solved': len(solved),
+        'optimal': sum(result['is_optimal'] for result in solved),
+        'optimal_share': sum(result['is_optimal'] for result in solved) / len(solved) if solved else 0,
+        'invalid': sum(result['stop_reason'] == 'invalid' for result in results),
+        'unreachable': sum(result['stop_reason'] == 'unreachable' for result in results),
+        'mean_generations': float(np.mean([result['generations'] for result in solved])) if solved else 0,
+        'wall_time': wall_time,
+        'queries_per_second': len(queries) / wall_time if wall_time > 0 else 0,
+    }
+    return results, metrics
+
+
+def random_queries(board, count, generator):
+    """
+    :param board: Board object
+    :param count: number of queries
+    :param generator: np.random.Generator
+    :return: list of (src, dst) pairs of uniformly drawn free positions
+    """
+    free = np.flatnonzero(~board.occupancy.ravel())
+    cells = generator.choice(free, size=(count, 2))
+    return [tuple(tuple(int(value) for value in divmod(cell, board.grid_size)) for cell in pair) for pair in cells]
+
+
+def run(board_size, queries, pop_size, obstacles_share=0, max_generations=MAX_GENERATIONS_LARGE_BOARD, seed=None,
+        workers=None, chunk_size=DEFAULT_CHUNK_SIZE, seed_fraction=0, backend='numpy', stagnation_generations=None):
+    """
+    solve random queries on a random board
+    :param board_size: size of 2d grid
+    :param queries: number of queries
+    :param pop_size: population size of every query
+    :param obstacles_share: share of obstacle squares in the grid, between 0 and 1
+    :param seed: root seed of the board, the queries and their runs. None for a random run
+    see solve_queries for the other parameters
+    :return: run summary dictionary
+    """
+    streams = RandomStreams(seed)
+    board = Board(board_size, draw_obstacles(streams.obstacles, board_size, obstacles_share))
+    query_list = random_queries(board, queries, streams.placement)
+    results, metrics = solve_queries(board, query_list, pop_size, max_generations, workers, chunk_size,
+                                     streams.seed, seed_fraction, backend, stagnation_generations)
+    summary = {
+        'board_size': board_size,
+        'population': pop_size,
+        'obstacles_share': obstacles_share,
+        'obstacles': board.obstacles_len,
+        'max_generations': max_generations,
+        'backend': backend,
+        'seed_fraction': seed_fraction,
+    }
+    summary.update(metrics)
+    summary['results'] = results
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Solve many src/dst queries on one grid with the genetic algorithm")
+    parser.add_argument('--board-size', type=int, default=50, help="size of the 2d grid")
+    parser.add_argument('--queries', type=int, default=100, help="number of random queries")
+    parser.add_argument('--population', type=int, default=20, help="population size of every query")
+    parser.add_argument('--obstacles', type=float, default=0, help="percent of grid squares that are obstacles")
+    parser.add_argument('--max-generations', type=int, default=MAX_GENERATIONS_LARGE_BOARD,
+                        help="generations limit of every query")
+    parser.add_argument('--stagnation', type=int, default=None,
+                        help="stop a query after this many generations without a better best path")
+    parser.add_argument('--seed', type=int, default=None, help="random seed")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="queries sent to a worker in a single task")
+    parser.add_argument('--seed-fraction', type=float, default=0,
+                        help="share of the initial population created by path heuristics instead of at random")
+    parser.add_argument('--backend', choices=QUERY_BACKENDS, default='numpy', help="fitness evaluation backend")
+    parser.add_argument('--output', default=DEFAULT_SUMMARY_FILE, help="json lines file the run summary is appended to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = run(args.board_size, args.queries, args.population, args.obstacles / 100, args.max_generations,
+                  args.seed, args.workers, args.chunk_size, args.seed_fraction, args.backend, args.stagnation)
+    write_summary(summary, args.output)
+    print("Queries: {queries}, solved: {solved}, optimal: {optimal} ({optimal_share:.1%}), invalid: {invalid}, "
+          "unreachable: {unreachable}, mean generations: {mean_generations:.1f}, wall time: {wall_time:.3f}s, "
+          "{queries_per_second:.1f} queries/s".format(**summary))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+process pool fitness evaluation. the population is split into chunks that are simulated in worker processes.
+the static grid (transition tables, source and destination) is sent once to every worker when the pool starts,
+so each generation only the chromosome arrays are pickled.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import simulate_population
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# static grid state of a worker process, set once by init_worker
+_worker_grid = None
+
+
+def init_worker(transitions, step_penalties, src_cell, dst_cell):
+    """
+    keep the static grid state in the worker process for all following generations
+    """
+    global _worker_grid
+    _worker_grid = (transitions, step_penalties, src_cell, dst_cell)
+
+
+def evaluate_chunk(codes, start=None, checkpoint_every=0, lengths=None, stall_limit=None):
+    """
+    simulate a chunk of the population in a worker process, see simulate_population
+    :param codes: integer array of direction indices in the shape (chunk size, chromosome length)
+    :return: final cell index and final path length arrays, and the checkpoints array or None
+    """
+    return simulate_population(codes, *_worker_grid, start=start, checkpoint_every=checkpoint_every,
+                               lengths=lengths, stall_limit=stall_limit)
+
+
+class ParallelEvaluator:
+    def __init__(self, genetic_alg, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        start a process pool bound to the grid of a genetic algorithm object
+        :param genetic_alg: GeneticAlg object, only its grid, source and destination are used
+        :param workers: number of worker processes, by default the number of CPUs
+        :param chunk_size: number of chromosomes sent to a worker in a single task
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.grid = (genetic_alg.transitions, genetic_alg.step_penalties,
+                     genetic_alg.cell_index(genetic_alg.src), genetic_alg.cell_index(genetic_alg.dst))
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=self.grid)
+
+    def evaluate(self, codes, start=None, checkpoint_every=0, lengths=None, stall_limit=None):
+        """
+        simulate the population in chunks on the process pool, see simulate_population
+        :param codes: integer array of direction indices in the shape (population size, chromosome length)
+        :param start: optional walk state to resume each chromosome from
+        :param checkpoint_every: record the walk state every checkpoint_every genes, 0 for no checkpoints
+        :param lengths: optional length of every chromosome
+        :param stall_limit: optional dead end rule, see simulate_population
+        :return: final cell index and final path length arrays, and the checkpoints array or None, in population order
+        """
+        offsets = range(0, len(codes), self.chunk_size)
+        chunks = [codes[i:i + self.chunk_size] for i in offsets]
+        starts = [None if start is None else start[i:i + self.chunk_size] for i in offsets]
+        chunk_lengths = [None if lengths is None else lengths[i:i + self.chunk_size] for i in offsets]
+        results = list(self.executor.map(evaluate_chunk, chunks, starts, [checkpoint_every] * len(chunks),
+                                         chunk_lengths, [stall_limit] * len(chunks)))
+        if not results:
+            return simulate_population(codes, *self.grid, start=start, checkpoint_every=checkpoint_every,
+                                       lengths=lengths, stall_limit=stall_limit)
+        cells, path_len, checkpoints = zip(*results)
+        return np.concatenate(cells), np.concatenate(path_len), \
+            np.concatenate(checkpoints) if checkpoint_every > 0 else None
+
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,90 @@
+"""
+profiling of genetic algorithm runs. PhaseProfiler collects the time spent in every phase of a generation
+(elitism, selection, crossover, mutation, simulation, fitness, statistics, get_path) and counters of the simulated
+moves. a GeneticAlg without a profiler only pays a None check per phase.
+cprofile wraps any code in cProfile and dumps the report to files, e.g. next to the run outputs.
+"""
+import contextlib
+import time
+
+# shared do-nothing context of the disabled phases
+NULL_PHASE = contextlib.nullcontext()
+
+# moves of all simulated walks: genes walked, moves into an obstacle, and moves off the grid
+COUNTERS = ['steps', 'obstacle_hits', 'wall_bumps']
+
+
+class PhaseProfiler:
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        # open phases, as [name, start time, time of nested phases]
+        self.stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        time a phase. phases can be nested, the time of a nested phase is only counted once, in the nested phase
+        :param name: phase name
+        """
+        entry = [name, time.perf_counter(), 0.0]
+        self.stack.append(entry)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - entry[1]
+            self.stack.pop()
+            self.times[name] = self.times.get(name, 0.0) + elapsed - entry[2]
+            self.calls[name] = self.calls.get(name, 0) + 1
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def report(self):
+        """
+        :return: dictionary of the phases total time, calls and mean time in seconds, and the counters
+        """
+        return {
+            'phases': {name: {'total': total, 'calls': self.calls[name], 'mean': total / self.calls[name]}
+                       for name, total in self.times.items()},
+            'counters': dict(self.counters),
+        }
+
+    def format_report(self):
+        """
+        :return: the report as a text table, phases sorted by total time
+        """
+        total = sum(self.times.values())
+        lines = ["phase                 total [s]    share    calls    mean [ms]"]
+        for name, phase_time in sorted(self.times.items(), key=lambda item: -item[1]):
+            lines.append("{:<20}{:>11.3f}{:>8.1f}%{:>9}{:>13.3f}".format(
+                name, phase_time, 100 * phase_time / total if total else 0, self.calls[name],
+                1e3 * phase_time / self.calls[name]))
+        lines.append(", ".join("{}: {}".format(name, value) for name, value in self.counters.items()))
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def cprofile(path, sort='cumulative', limit=40):
+    """
+    profile the code in the context with cProfile, and dump the raw stats to path and a text report to path + '.txt'
+    :param path: stats file, can be loaded with pstats or snakeviz
+    :param sort: sort key of the text report
+    :param limit: number of functions in the text report
+    """
+    # imported on first use, every GeneticAlg imports this module but few runs are profiled
+    import cProfile
+    import io
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats(sort).print_stats(limit)
+        with open(path + '.txt', 'w') as report_file:
+            report_file.write(report.getvalue())
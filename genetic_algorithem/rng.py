@@ -0,0 +1,70 @@
+"""
+seedable random streams. a run is driven by a single root seed, every purpose (placement of the source and
+destination, the initial population, the obstacles, the reproduction of every generation and the heuristic seeding
+of the initial population) draws from its own np.random.Generator spawned from that seed, so the streams don't
+depend on each other: changing how many values one of them draws, e.g. a different fitness backend or a batched
+reproduction, doesn't shift the others.
+worker processes get their own child streams with spawn.
+"""
+import numpy as np
+
+# purposes of the streams of a run, in spawn order. new purposes are appended, so existing streams keep their values
+STREAM_PURPOSES = ['placement', 'population', 'obstacles', 'reproduction', 'seeding']
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        """
+        :param seed: root seed, an int or a np.random.SeedSequence, None for fresh entropy
+        """
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        children = self.seed_sequence.spawn(len(STREAM_PURPOSES))
+        for purpose, child in zip(STREAM_PURPOSES, children):
+            setattr(self, purpose, np.random.default_rng(child))
+
+    @property
+    def seed(self):
+        """
+        root entropy, a run created with this seed draws the same values. with seed=None this is the fresh entropy,
+        so even unseeded runs can be reproduced
+        """
+        return self.seed_sequence.entropy
+
+    def spawn(self, n):
+        """
+        independent streams for worker processes or sub runs, the i-th child is the same on every run with this seed
+        :param n: number of children
+        :return: list of RandomStreams objects
+        """
+        return [RandomStreams(child) for child in self.seed_sequence.spawn(n)]
+
+    def random_cell(self, grid_size):
+        """
+        :param grid_size: size of 2d grid
+        :return: uniformly drawn (x,y) position from the placement stream
+        """
+        row, col = self.placement.integers(0, grid_size, size=2)
+        return int(row), int(col)
+
+    def get_state(self):
+        """
+        :return: bit generator state of every stream, see set_state
+        """
+        return {purpose: getattr(self, purpose).bit_generator.state for purpose in STREAM_PURPOSES}
+
+    def set_state(self, state):
+        """
+        restore the streams to a state returned by get_state
+        :param state: dictionary of purpose to bit generator state
+        :return:
+        """
+        for purpose, stream_state in state.items():
+            getattr(self, purpose).bit_generator.state = stream_state
+
+
+def make_streams(rng=None):
+    """
+    :param rng: a RandomStreams object, or a seed for a new one
+    :return: RandomStreams object
+    """
+    return rng if isinstance(rng, RandomStreams) else RandomStreams(rng)
@@ -0,0 +1,110 @@
+"""
+heuristic seeding of the initial population. instead of starting only from uniformly random chromosomes, a share
+of the first generation is created by cheap path heuristics:
+    greedy - walk towards dst, each step is a random move that reduces the manhattan distance
+    bfs - a random shortest path around the obstacles, following the breadth first search distances to dst
+    perturbed - a greedy or bfs path with random gene mutations, so the seeds don't all look alike
+genes after the end of a seeded path keep their random values, the walk stops at dst before reaching them.
+"""
+import numpy as np
+
+SEEDING_STRATEGIES = ['greedy', 'bfs', 'perturbed']
+# mutation probability of every gene of a perturbed path
+PERTURBATION_P = 0.05
+
+
+def open_moves(genetic_alg, cell):
+    """
+    :return: list of (direction index, next cell) of the moves from a cell that aren't blocked by a wall or obstacle
+    """
+    return [(code, next_cell) for code, next_cell in enumerate(genetic_alg.transitions[cell].tolist())
+            if next_cell != cell]
+
+
+def greedy_walk(genetic_alg, generator):
+    """
+    walk from src towards dst. every step is a random direction among the open ones that reduce the manhattan
+    distance, or among all open directions when an obstacle blocks all of them
+    :param genetic_alg: GeneticAlg object, only its grid, source and destination are used
+    :param generator: np.random.Generator
+    :return: list of direction indices, at most chromosome_len genes
+    """
+    cell = genetic_alg.cell_index(genetic_alg.src)
+    dst_cell = genetic_alg.cell_index(genetic_alg.dst)
+    genes = []
+    while cell != dst_cell and len(genes) < genetic_alg.chromosome_len:
+        moves = open_moves(genetic_alg, cell)
+        if not moves:
+            break
+        distance = genetic_alg.l1_distance(genetic_alg.cell_position(cell))
+        closer = [move for move in moves if genetic_alg.l1_distance(genetic_alg.cell_position(move[1])) < distance]
+        candidates = closer or moves
+        code, cell = candidates[generator.integers(len(candidates))]
+        genes.append(code)
+    return genes
+
+
+def bfs_walk(genetic_alg, distances, generator):
+    """
+    random shortest path from src to dst. every step is a random direction among the ones that are one move closer
+    to dst, so different calls return different shortest paths
+    :param genetic_alg: GeneticAlg object, only its grid, source and destination are used
+    :param distances: distance of every cell to dst, see GeneticAlg.dst_distances
+    :param generator: np.random.Generator
+    :return: list of direction indices, at most chromosome_len genes, or None if dst can't be reached from src
+    """
+    cell = genetic_alg.cell_index(genetic_alg.src)
+    if distances[cell] < 0:
+        return None
+    genes = []
+    while distances[cell] > 0 and len(genes) < genetic_alg.chromosome_len:
+        candidates = [move for move in open_moves(genetic_alg, cell) if distances[move[1]] == distances[cell] - 1]
+        code, cell = candidates[generator.integers(len(candidates))]
+        genes.append(code)
+    return genes
+
+
+def perturb(genes, generator, probability=PERTURBATION_P):
+    """
+    :param genes: list of direction indices
+    :return: copy of the genes with every gene replaced by a random direction in the given probability
+    """
+    genes = np.array(genes, dtype=np.uint8)
+    mutate = generator.random(len(genes)) < probability
+    genes[mutate] = generator.integers(4, size=np.count_nonzero(mutate))
+    return genes.tolist()
+
+
+def seed_population(genetic_alg, count, strategies=None):
+    """
+    overwrite the first chromosomes of the initial population with heuristic paths. the strategies take turns,
+    so each one seeds about the same number of chromosomes. bfs paths fall back to greedy walks when dst can't be
+    reached from src.
+    :param genetic_alg: GeneticAlg object, during its initialization
+    :param count: number of seeded chromosomes
+    :param strategies: list of SEEDING_STRATEGIES names, by default all of them
+    :return: list of the strategy of every seeded chromosome
+    """
+    strategies = strategies or SEEDING_STRATEGIES
+    for strategy in strategies:
+        if strategy not in SEEDING_STRATEGIES:
+            raise ValueError("Unknown seeding strategy: " + str(strategy))
+    generator = genetic_alg.random.seeding
+    distances = genetic_alg.dst_distances
+
+    used = []
+    for i in range(min(count, genetic_alg.population_size)):
+        strategy = strategies[i % len(strategies)]
+        genes = None
+        if strategy == 'bfs' or (strategy == 'perturbed' and generator.random() < 0.5):
+            genes = bfs_walk(genetic_alg, distances, generator)
+        if genes is None:
+            genes = greedy_walk(genetic_alg, generator)
+        if strategy == 'perturbed':
+            genes = perturb(genes, generator)
+        genetic_alg.initial_codes[i, :len(genes)] = genes
+        if genetic_alg.initial_lengths is not None:
+            genetic_alg.initial_lengths[i] = np.clip(len(genes), genetic_alg.min_chromosome_len,
+                                                     genetic_alg.chromosome_len)
+        used.append(strategy)
+    return used
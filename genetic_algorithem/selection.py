@@ -0,0 +1,151 @@
+"""
+parent selection operators. the parents of all sons of a generation are selected in a single call, so every
+operator builds its table once per generation and then samples each parent in O(1) or O(log n):
+    roulette - fitness proportional, binary search in the cumulative sum of the fitness. draws the same parents as
+               Generator.choice with p, without validating p on every call
+    alias - fitness proportional, Walker's alias table, two random numbers and a table lookup per parent
+    tournament - the fittest of a few uniformly drawn chromosomes, no table at all
+    rank - linear ranking, the selection pressure doesn't depend on the fitness scale
+    sus - stochastic universal sampling, fitness proportional with evenly spaced pointers, so every chromosome is
+          selected within one of its expected number of times
+"""
+import numpy as np
+
+DEFAULT_TOURNAMENT_SIZE = 2
+# expected number of selections of the best chromosome in rank selection, between 1 and 2
+DEFAULT_RANK_PRESSURE = 1.5
+
+
+def cumulative_distribution(weights):
+    """
+    :param weights: non negative weights
+    :return: normalized cumulative sum of the weights, for searchsorted sampling
+    """
+    cdf = np.cumsum(weights, dtype=np.float64)
+    cdf /= cdf[-1]
+    return cdf
+
+
+class RouletteSelection:
+    name = 'roulette'
+
+    def select(self, fitness, shape, generator):
+        """
+        :param fitness: fitness of every chromosome, a probability vector
+        :param shape: shape of the returned array, e.g. (sons, 2) for a pair of parents per son
+        :param generator: np.random.Generator
+        :return: integer array of selected chromosome indices
+        """
+        return cumulative_distribution(fitness).searchsorted(generator.random(shape), side='right')
+
+
+class AliasSelection:
+    name = 'alias'
+
+    def build(self, fitness):
+        """
+        Vose's construction of Walker's alias table, O(n)
+        :param fitness: fitness of every chromosome
+        :return: probability of keeping each column and the alias of each column
+        """
+        n = len(fitness)
+        scaled = (np.asarray(fitness, dtype=np.float64) * (n / np.sum(fitness))).tolist()
+        keep = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            keep[less] = scaled[less]
+            alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # columns left in either list are full up to rounding errors, they keep probability 1
+        return np.array(keep), np.array(alias)
+
+    def select(self, fitness, shape, generator):
+        """
+        see RouletteSelection.select
+        """
+        keep, alias = self.build(fitness)
+        columns = generator.integers(len(keep), size=shape)
+        return np.where(generator.random(shape) < keep[columns], columns, alias[columns])
+
+
+class TournamentSelection:
+    name = 'tournament'
+
+    def __init__(self, size=DEFAULT_TOURNAMENT_SIZE):
+        """
+        :param size: chromosomes drawn for every tournament, larger tournaments select fitter parents
+        """
+        if size < 1:
+            raise ValueError("tournament size must be positive")
+        self.size = size
+
+    def select(self, fitness, shape, generator):
+        """
+        see RouletteSelection.select
+        """
+        fitness = np.asarray(fitness)
+        shape = (shape,) if np.isscalar(shape) else tuple(shape)
+        entrants = generator.integers(len(fitness), size=shape + (self.size,))
+        winners = fitness[entrants].argmax(axis=-1)
+        return np.take_along_axis(entrants, winners[..., None], axis=-1)[..., 0]
+
+
+class RankSelection:
+    name = 'rank'
+
+    def __init__(self, pressure=DEFAULT_RANK_PRESSURE):
+        """
+        :param pressure: expected number of selections of the best chromosome, the worst one is expected
+        2 - pressure times, between 1 (uniform) and 2
+        """
+        if not 1 <= pressure <= 2:
+            raise ValueError("rank pressure must be between 1 and 2")
+        self.pressure = pressure
+
+    def select(self, fitness, shape, generator):
+        """
+        see RouletteSelection.select
+        """
+        n = len(fitness)
+        ranks = np.empty(n)
+        ranks[np.argsort(fitness, kind='stable')] = np.arange(n)
+        weights = 2 - self.pressure + 2 * (self.pressure - 1) * ranks / max(n - 1, 1)
+        return cumulative_distribution(weights).searchsorted(generator.random(shape), side='right')
+
+
+class StochasticUniversalSampling:
+    name = 'sus'
+
+    def select(self, fitness, shape, generator):
+        """
+        see RouletteSelection.select. the selected chromosomes are shuffled, so the parents of a son are a random
+        pair of them
+        """
+        count = int(np.prod(shape))
+        pointers = (generator.random() + np.arange(count)) / count
+        selected = cumulative_distribution(fitness).searchsorted(pointers, side='right')
+        return generator.permutation(selected).reshape(shape)
+
+
+SELECTION_METHODS = {method.name: method for method in
+                     [RouletteSelection, AliasSelection, TournamentSelection, RankSelection,
+                      StochasticUniversalSampling]}
+
+
+def make_selection(selection=None):
+    """
+    :param selection: a selection operator, or the name of one of SELECTION_METHODS with its default parameters,
+    by default roulette
+    :return: selection operator
+    """
+    if selection is None:
+        selection = RouletteSelection.name
+    if isinstance(selection, str):
+        if selection not in SELECTION_METHODS:
+            raise ValueError("Unknown selection method: " + selection)
+        return SELECTION_METHODS[selection]()
+    return selection
@@ -0,0 +1,121 @@
+"""
+streaming per-generation statistics. the recorder keeps the latest generations in preallocated ring buffers,
+one numpy array per metric, and periodically appends the new values to one raw file per metric, so memory stays
+constant however long the run is, and the files can be memory mapped and analyzed while the run continues.
+"""
+import json
+import os
+import time
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import OUTPUTS_DIR
+
+STATS_DIR = os.path.join(OUTPUTS_DIR, 'stats')
+DEFAULT_CAPACITY = 4096
+DEFAULT_FLUSH_EVERY = 256
+
+# recorded metrics and their types
+STATS_COLUMNS = [
+    ('generation', np.int64),
+    ('best_fitness', np.float64),
+    ('worst_fitness', np.float64),
+    ('mean_fitness', np.float64),
+    ('std_fitness', np.float64),
+    ('best_length', np.int64),
+    ('best_distance', np.int64),
+    ('eval_time', np.float64),
+]
+META_FILE = 'meta.json'
+
+
+def column_file(directory, name):
+    return os.path.join(directory, name + '.bin')
+
+
+class StatsRecorder:
+    def __init__(self, directory=None, capacity=DEFAULT_CAPACITY, flush_every=DEFAULT_FLUSH_EVERY):
+        """
+        :param directory: directory of the column files, by default a new time stamped directory under outputs/stats
+        :param capacity: number of generations kept in memory
+        :param flush_every: new generations are appended to the files every flush_every generations
+        """
+        if not 0 < flush_every <= capacity:
+            raise ValueError("flush_every must be positive and at most capacity")
+        self.directory = directory or os.path.join(STATS_DIR, time.strftime('%Y%m%d_%H%M%S'))
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in STATS_COLUMNS}
+        self.count = 0
+        self.flushed = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, META_FILE), 'w') as meta_file:
+            json.dump({'columns': [[name, np.dtype(dtype).str] for name, dtype in STATS_COLUMNS]}, meta_file)
+        for name, dtype in STATS_COLUMNS:
+            open(column_file(self.directory, name), 'wb').close()
+
+    def record(self, genetic_alg):
+        """
+        add the statistics of the current generation
+        :param genetic_alg: GeneticAlg object, after update_statistics
+        :return:
+        """
+        i = self.count % self.capacity
+        fitness = np.asarray(genetic_alg.cur_gen_fitness)
+        self.columns['generation'][i] = genetic_alg.cur_generation
+        self.columns['best_fitness'][i] = fitness.max()
+        self.columns['worst_fitness'][i] = fitness.min()
+        self.columns['mean_fitness'][i] = fitness.mean()
+        self.columns['std_fitness'][i] = fitness.std()
+        self.columns['best_length'][i] = genetic_alg.cur_best_length
+        self.columns['best_distance'][i] = genetic_alg.cur_best_distance
+        self.columns['eval_time'][i] = genetic_alg.eval_time
+        self.count += 1
+        if self.count - self.flushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        append the generations recorded since the last flush to the column files
+        :return:
+        """
+        if self.count == self.flushed:
+            return
+        indices = np.arange(self.flushed, self.count) % self.capacity
+        for name, column in self.columns.items():
+            with open(column_file(self.directory, name), 'ab') as column_out:
+                column[indices].tofile(column_out)
+        self.flushed = self.count
+
+    def recent(self, name):
+        """
+        :param name: metric name
+        :return: the values of the generations still in memory, oldest first
+        """
+        kept = min(self.count, self.capacity)
+        return self.columns[name][np.arange(self.count - kept, self.count) % self.capacity]
+
+    def close(self):
+        self.flush()
+
+
+def load_stats(directory):
+    """
+    memory map the column files of a recorder, also while it is still recording
+    :param directory: recorder directory
+    :return: dictionary of metric name to read only array
+    """
+    with open(os.path.join(directory, META_FILE)) as meta_file:
+        columns = json.load(meta_file)['columns']
+    stats = {}
+    for name, dtype in columns:
+        path = column_file(directory, name)
+        length = os.path.getsize(path) // np.dtype(dtype).itemsize
+        if length == 0:
+            stats[name] = np.zeros(0, dtype=dtype)
+        else:
+            stats[name] = np.memmap(path, dtype=dtype, mode='r', shape=(length,))
+    # columns are flushed one after the other, during a flush the first columns may already have the new values
+    length = min(len(column) for column in stats.values())
+    return {name: column[:length] for name, column in stats.items()}
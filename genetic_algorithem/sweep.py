@@ -0,0 +1,156 @@
+"""
+parameter sweep: run a headless genetic algorithm experiment for every combination of board size, population size,
+obstacles percent and seed, in parallel worker processes. results are streamed to a csv file as experiments finish,
+and experiments that already have a result in the file are skipped, so an interrupted sweep can be resumed.
+run from the repository root, for example:
+    python -m genetic_algorithem.sweep --board-sizes 10 100 --populations 20 40 60 --seeds 0 1 2
+"""
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from genetic_algorithem.genetic_alg import FITNESS_BACKENDS, OUTPUTS_DIR
+from genetic_algorithem.headless import run
+
+# the options the GUI offers as radio buttons
+BOARD_SIZES = [10, 100]
+POPULATION_SIZES = [20, 40, 60]
+OBSTACLES_PERCENTS = [0, 10, 20, 30]
+SEEDS = [0]
+
+DEFAULT_SWEEP_FILE = os.path.join(OUTPUTS_DIR, 'sweep.csv')
+
+# experiment parameters, a result row is identified by these columns
+KEY_FIELDS = ['board_size', 'population', 'obstacles_percent', 'seed']
+RESULT_FIELDS = ['generations', 'max_generations', 'is_optimal', 'stop_reason', 'best_fitness', 'worst_fitness', 'average_fitness',
+                 'best_length', 'best_distance', 'best_possible_len', 'obstacles', 'src', 'dst', 'wall_time']
+SWEEP_FIELDS = KEY_FIELDS + RESULT_FIELDS
+
+
+def experiment_key(board_size, population, obstacles_percent, seed):
+    return int(board_size), int(population), float(obstacles_percent), int(seed)
+
+
+def parameter_grid(board_sizes=BOARD_SIZES, population_sizes=POPULATION_SIZES,
+                   obstacles_percents=OBSTACLES_PERCENTS, seeds=SEEDS):
+    """
+    all experiment combinations
+    :return: list of (board size, population size, obstacles percent, seed) keys
+    """
+    return [experiment_key(*parameters) for parameters in
+            itertools.product(board_sizes, population_sizes, obstacles_percents, seeds)]
+
+
+def drop_partial_row(path):
+    """
+    drop a partial last row left by a crash, every row that is kept ends with a newline
+    :param path: sweep csv file
+    :return:
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as sweep_file:
+        content = sweep_file.read()
+        header = content.split(b'\n', 1)[0].decode().strip()
+        if header and header != ','.join(SWEEP_FIELDS):
+            raise ValueError("{} has other columns than this version of the sweep, use a new output file"
+                             .format(path))
+        sweep_file.truncate(content.rfind(b'\n') + 1)
+
+
+def completed_experiments(path):
+    """
+    read the keys of experiments that already have a complete result row in the sweep file, call drop_partial_row
+    first so a row cut in the middle by a crash isn't counted
+    :param path: sweep csv file
+    :return: set of experiment keys
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='') as sweep_file:
+        return {experiment_key(*[row[field] for field in KEY_FIELDS]) for row in csv.DictReader(sweep_file)
+                if row.get(SWEEP_FIELDS[-1])}
+
+
+def run_experiment(key, max_generations=None, backend='numpy'):
+    """
+    run a single experiment in a worker process
+    :param key: (board size, population size, obstacles percent, seed)
+    :return: result row
+    """
+    board_size, population, obstacles_percent, seed = key
+    summary = run(board_size, population, obstacles_percent / 100, max_generations, seed, backend=backend)
+    row = dict(zip(KEY_FIELDS, key))
+    row.update((field, summary[field]) for field in RESULT_FIELDS)
+    return row
+
+
+def sweep(experiments, path=DEFAULT_SWEEP_FILE, workers=None, max_generations=None, backend='numpy'):
+    """
+    run all experiments that are not in the sweep file yet, and append each result as soon as it is ready
+    :param experiments: list of experiment keys, see parameter_grid
+    :param path: sweep csv file
+    :param workers: number of worker processes, by default the number of CPUs
+    :param max_generations: generations limit for each run, by default the GUI limit for the board size
+    :param backend: fitness evaluation backend of each run
+    :return: number of experiments that were run and have a result row. an experiment that fails is reported and
+    has no row, so it runs again when the sweep is resumed
+    """
+    # the partial row is dropped first, so its experiment is pending again
+    drop_partial_row(path)
+    done = completed_experiments(path)
+    pending = [key for key in experiments if key not in done]
+    if not pending:
+        return 0
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+
+    with open(path, 'a', newline='') as sweep_file, ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(sweep_file, fieldnames=SWEEP_FIELDS)
+        if write_header:
+            writer.writeheader()
+        futures = {executor.submit(run_experiment, key, max_generations, backend): key for key in pending}
+        completed = 0
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as error:
+                print("Failed: board size {}, population {}, obstacles {}%, seed {}: {!r}".format(*futures[future],
+                                                                                                  error))
+                continue
+            writer.writerow(row)
+            sweep_file.flush()
+            completed += 1
+            print("Done: board size {}, population {}, obstacles {}%, seed {}".format(*futures[future]))
+    return completed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a grid of genetic algorithm experiments in parallel")
+    parser.add_argument('--board-sizes', type=int, nargs='+', default=BOARD_SIZES)
+    parser.add_argument('--populations', type=int, nargs='+', default=POPULATION_SIZES)
+    parser.add_argument('--obstacles', type=float, nargs='+', default=OBSTACLES_PERCENTS,
+                        help="percents of grid squares that are obstacles")
+    parser.add_argument('--seeds', type=int, nargs='+', default=SEEDS)
+    parser.add_argument('--max-generations', type=int, default=None)
+    parser.add_argument('--backend', choices=FITNESS_BACKENDS, default='numpy',
+                        help="fitness evaluation backend of each run")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: number of CPUs)")
+    parser.add_argument('--output', default=DEFAULT_SWEEP_FILE, help="csv file results are appended to")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    experiments = parameter_grid(args.board_sizes, args.populations, args.obstacles, args.seeds)
+    ran = sweep(experiments, args.output, args.workers, args.max_generations, args.backend)
+    print("Ran {} of {} experiments, results in {}".format(ran, len(experiments), args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""
+termination policies of a genetic algorithm run. a run is checked by a list of policies before every generation,
+and stops with the reason of the first policy that asks to stop:
+    optimal - the best path is optimal
+    unreachable - dst can't be reached from src, known from the breadth first search of the genetic algorithm
+    max_generations - the generations limit
+    stagnation - the best path didn't improve for a number of generations
+    diversity - the population converged to (almost) identical chromosomes
+    time_budget - the wall clock budget of the run is used up
+"""
+import time
+
+import numpy as np
+
+DEFAULT_STAGNATION_GENERATIONS = 100
+# stop when the average share of the chromosomes that differ from the most common gene is below this
+DEFAULT_MIN_DIVERSITY = 0.01
+DIVERSITY_CHECK_EVERY = 10
+
+
+class OptimalPath:
+    reason = 'optimal'
+
+    def start(self, genetic_alg):
+        pass
+
+    def should_stop(self, genetic_alg):
+        return genetic_alg.is_optimal
+
+
+class Reachability:
+    reason = 'unreachable'
+
+    def __init__(self):
+        self.reachable = True
+
+    def start(self, genetic_alg):
+        """
+        the grid is searched once by the genetic algorithm, the obstacles don't change during a run
+        """
+        self.reachable = genetic_alg.dst_reachable
+
+    def should_stop(self, genetic_alg):
+        return not self.reachable
+
+
+class GenerationLimit:
+    reason = 'max_generations'
+
+    def __init__(self, max_generations):
+        self.max_generations = max_generations
+
+    def start(self, genetic_alg):
+        pass
+
+    def should_stop(self, genetic_alg):
+        return genetic_alg.cur_generation >= self.max_generations
+
+
+class Stagnation:
+    reason = 'stagnation'
+
+    def __init__(self, generations=DEFAULT_STAGNATION_GENERATIONS):
+        """
+        :param generations: stop after this many generations without a better best path. the best path is compared by
+        3 * distance + length, the unnormalized fitness, since best_fitness is relative to the rest of its generation
+        """
+        self.generations = generations
+        self.best_score = None
+        self.best_generation = 0
+
+    def start(self, genetic_alg):
+        self.best_score = None
+        self.best_generation = genetic_alg.cur_generation
+
+    def should_stop(self, genetic_alg):
+        score = 3 * genetic_alg.cur_best_distance + genetic_alg.cur_best_length
+        if self.best_score is None or score < self.best_score:
+            self.best_score = score
+            self.best_generation = genetic_alg.cur_generation
+        return genetic_alg.cur_generation - self.best_generation >= self.generations
+
+
+def gene_diversity(codes):
+    """
+    :param codes: integer array of direction indices in the shape (population size, chromosome length)
+    :return: average over the genes of the share of chromosomes that differ from the most common direction of the gene,
+    0 when all chromosomes are identical
+    """
+    counts = np.stack([np.count_nonzero(codes == code, axis=0) for code in range(4)])
+    return float(1 - counts.max(axis=0).mean() / len(codes))
+
+
+class DiversityCollapse:
+    reason = 'diversity'
+
+    def __init__(self, min_diversity=DEFAULT_MIN_DIVERSITY, check_every=DIVERSITY_CHECK_EVERY):
+        """
+        :param min_diversity: stop when gene_diversity of the population is below this
+        :param check_every: the diversity is computed every check_every generations
+        """
+        self.min_diversity = min_diversity
+        self.check_every = check_every
+        self.diversity = None
+
+    def start(self, genetic_alg):
+        self.diversity = None
+
+    def should_stop(self, genetic_alg):
+        if genetic_alg.cur_generation % self.check_every != 0:
+            return False
+        self.diversity = gene_diversity(genetic_alg.cur_gen_codes)
+        return self.diversity < self.min_diversity
+
+
+class TimeBudget:
+    reason = 'time_budget'
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = None
+
+    def start(self, genetic_alg):
+        self.deadline = time.perf_counter() + self.seconds
+
+    def should_stop(self, genetic_alg):
+        return time.perf_counter() >= self.deadline
+
+
+class Termination:
+    def __init__(self, policies):
+        """
+        :param policies: list of policies, checked in order
+        """
+        self.policies = policies
+
+    def start(self, genetic_alg):
+        """
+        prepare the policies for a run, before its first generation
+        """
+        for policy in self.policies:
+            policy.start(genetic_alg)
+
+    def check(self, genetic_alg):
+        """
+        :return: the reason of the first policy that asks to stop, or None to continue
+        """
+        for policy in self.policies:
+            if policy.should_stop(genetic_alg):
+                return policy.reason
+        return None
+
+    def run(self, genetic_alg):
+        """
+        create new generations until a policy asks to stop. the reason is kept in genetic_alg.stop_reason
+        :param genetic_alg: GeneticAlg object
+        :return: stop reason
+        """
+        self.start(genetic_alg)
+        reason = self.check(genetic_alg)
+        while reason is None:
+            genetic_alg.new_generation()
+            reason = self.check(genetic_alg)
+        genetic_alg.stop_reason = reason
+        return reason
+
+
+def default_termination(max_generations, stagnation_generations=None, min_diversity=None, time_budget=None):
+    """
+    the optimal path, reachability and generations limit policies, and the optional ones that are given
+    :param max_generations: generations limit
+    :param stagnation_generations: optional Stagnation generations
+    :param min_diversity: optional DiversityCollapse threshold
+    :param time_budget: optional TimeBudget seconds
+    :return: Termination object
+    """
+    policies = [OptimalPath(), Reachability(), GenerationLimit(max_generations)]
+    if stagnation_generations is not None:
+        policies.append(Stagnation(stagnation_generations))
+    if min_diversity is not None:
+        policies.append(DiversityCollapse(min_diversity))
+    if time_budget is not None:
+        policies.append(TimeBudget(time_budget))
+    return Termination(policies)
@@ -0,0 +1,96 @@
+"""
+verbosity levels for the genetic algorithm log, and a buffered trace sink that stores every generation
+(population, destinations, path lengths and fitness) in compressed files, written on a background thread
+so the evaluation loop never waits for disk.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from genetic_algorithem.genetic_alg import OUTPUTS_DIR, TRACE
+
+# verbosity (for example the number of -v flags) to log level
+VERBOSITY_LEVELS = [logging.WARNING, logging.INFO, logging.DEBUG, TRACE]
+
+TRACES_DIR = os.path.join(OUTPUTS_DIR, 'traces')
+
+
+def generation_file(directory, generation):
+    return os.path.join(directory, 'generation_%06d.npz' % generation)
+
+
+def configure_logging(verbosity=0):
+    """
+    send the genetic algorithm log to stderr
+    :param verbosity: 0 for warnings only, 1 for run information, 2 for debug details, 3 for every chromosome
+    :return:
+    """
+    level = VERBOSITY_LEVELS[min(max(verbosity, 0), len(VERBOSITY_LEVELS) - 1)]
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger('genetic_algorithem').setLevel(level)
+
+
+class TraceSink:
+    def __init__(self, directory=None, max_pending=0):
+        """
+        start the background writer
+        :param directory: directory of the trace files, by default a new time stamped directory under outputs/traces
+        :param max_pending: generations that may wait for the writer, 0 for unlimited.
+        when the limit is reached new generations are dropped (and counted) instead of blocking the caller
+        """
+        self.directory = directory or os.path.join(TRACES_DIR, time.strftime('%Y%m%d_%H%M%S'))
+        os.makedirs(self.directory, exist_ok=True)
+        self.dropped = 0
+        self.pending = queue.Queue(max_pending)
+        self.writer = threading.Thread(target=self.write_pending, daemon=True)
+        self.writer.start()
+
+    def record(self, generation, codes, chromo_dst_tup, fitness):
+        """
+        queue a generation for writing, the population array is copied since its buffer is reused
+        :param generation: generation number
+        :param codes: population array of direction indices
+        :param chromo_dst_tup: (destination, path length) of each chromosome
+        :param fitness: normalized fitness of each chromosome
+        :return:
+        """
+        try:
+            self.pending.put_nowait((generation, codes.copy(), chromo_dst_tup, fitness))
+        except queue.Full:
+            self.dropped += 1
+
+    def write_pending(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                break
+            generation, codes, chromo_dst_tup, fitness = item
+            np.savez_compressed(generation_file(self.directory, generation), population=codes,
+                                destinations=np.array([chromo_dst[0] for chromo_dst in chromo_dst_tup]),
+                                path_len=np.array([chromo_dst[1] for chromo_dst in chromo_dst_tup]),
+                                fitness=np.array(fitness))
+
+    def close(self):
+        """
+        write all queued generations and stop the background writer
+        :return:
+        """
+        self.pending.put(None)
+        self.writer.join()
+        if self.dropped > 0:
+            logging.getLogger(__name__).warning("Trace dropped %d generations", self.dropped)
+
+
+def load_generation(directory, generation):
+    """
+    read a generation written by TraceSink
+    :param directory: trace directory
+    :param generation: generation number
+    :return: dictionary of population, destinations, path_len and fitness arrays
+    """
+    with np.load(generation_file(directory, generation)) as trace:
+        return dict(trace)
@@ -0,0 +1,89 @@
+"""
+run the genetic algorithm on a background thread. after every generation the thread publishes a snapshot
+of the values the GUI shows, and the GUI polls the latest snapshot at its own frame rate,
+so the generation rate doesn't depend on how fast the board is redrawn.
+"""
+import threading
+
+from genetic_algorithem.termination import default_termination
+
+
+class Snapshot:
+    def __init__(self, genetic_alg):
+        """
+        copy the displayed state of a GeneticAlg object. snapshots have the same attribute names as GeneticAlg,
+        so they can be passed to RobotGrid.update and to the GUI labels and plots
+        :param genetic_alg: GeneticAlg object, between generations
+        """
+        self.src = genetic_alg.src
+        self.dst = genetic_alg.dst
+        self.obstacles = genetic_alg.obstacles
+        self.obstacles_len = genetic_alg.obstacles_len
+        self.population_size = genetic_alg.population_size
+        self.chromosome_len = genetic_alg.chromosome_len
+        self.best_possible_len = genetic_alg.best_possible_len
+        self.cur_generation = genetic_alg.cur_generation
+        self.is_optimal = genetic_alg.is_optimal
+        self.stop_reason = genetic_alg.stop_reason
+        self.cur_best_location = genetic_alg.cur_best_location
+        self.cur_best_length = genetic_alg.cur_best_length
+        self.cur_best_distance = genetic_alg.cur_best_distance
+        self.cur_worst_location = genetic_alg.cur_worst_location
+        self.cur_worst_length = genetic_alg.cur_worst_length
+        self.cur_worst_distance = genetic_alg.cur_worst_distance
+        self.prev_best_path = genetic_alg.prev_best_path[:]
+        self.cur_best_path = genetic_alg.cur_best_path[:]
+        self.cur_gen_fitness = genetic_alg.cur_gen_fitness[:]
+        self.best_fitness = genetic_alg.best_fitness[:]
+        self.worst_fitness = genetic_alg.worst_fitness[:]
+        self.average_fitness = genetic_alg.average_fitness[:]
+
+
+class GeneticAlgWorker(threading.Thread):
+    def __init__(self, genetic_alg, max_generations, termination=None):
+        """
+        :param genetic_alg: GeneticAlg object, it must not be used by other threads until the worker is done
+        :param max_generations: the worker stops after this generation
+        :param termination: termination.Termination of the run, by default the optimal path, reachability and
+        max_generations policies
+        """
+        super().__init__(daemon=True)
+        self.genetic_alg = genetic_alg
+        self.max_generations = max_generations
+        self.termination = termination or default_termination(max_generations)
+        self.stop_requested = threading.Event()
+        self.lock = threading.Lock()
+        self.latest = Snapshot(genetic_alg)
+
+    def run(self):
+        genetic_alg = self.genetic_alg
+        self.termination.start(genetic_alg)
+        reason = self.termination.check(genetic_alg)
+        while reason is None and not self.stop_requested.is_set():
+            genetic_alg.new_generation()
+            reason = self.termination.check(genetic_alg)
+            if reason is None:
+                self.publish()
+        genetic_alg.stop_reason = reason or 'stopped'
+        if genetic_alg.checkpointer is not None:
+            genetic_alg.checkpointer.save(genetic_alg)
+        self.publish()
+
+    def publish(self):
+        snapshot = Snapshot(self.genetic_alg)
+        with self.lock:
+            self.latest = snapshot
+
+    def snapshot(self):
+        """
+        :return: the snapshot of the last finished generation
+        """
+        with self.lock:
+            return self.latest
+
+    def stop(self):
+        """
+        ask the worker to stop after the current generation
+        :return:
+        """
+        self.stop_requested.set()
@@ -0,0 +1,77 @@
+"""
+the python, numpy and process fitness backends, with and without the fitness cache, walk every chromosome to the
+same (position, path length) as the original make_step walk and give the same normalized fitness.
+run from the repository root:
+    python -m pytest tests
+"""
+import pytest
+
+from genetic_algorithem.genetic_alg import GeneticAlg
+
+GENERATIONS = 5
+BACKENDS = ['python', 'numpy', 'process']
+OPTIONS = [{}, {'variable_length': True}, {'stall_limit': 3}, {'variable_length': True, 'stall_limit': 2}]
+
+
+def create_genetic_alg(backend, cache_size=0, **options):
+    return GeneticAlg(30, 15, (0, 0), (14, 11), 0.3, backend=backend, workers=2, chunk_size=8, rng=5,
+                      cache_size=cache_size, **options)
+
+
+def make_step_walk(genetic_alg, chromosome):
+    """
+    walk a chromosome with make_step, one direction at a time, the way the fitness was first calculated
+    :param chromosome: list of direction indices
+    :return: destination point on the grid and the final path length
+    """
+    position = genetic_alg.src
+    path_len = 0
+    penalty = 0
+    stalled = 0
+    for code in chromosome:
+        if position == genetic_alg.dst:
+            break
+        path_len += 1 + penalty
+        next_step, penalty = genetic_alg.make_step(position, GeneticAlg.Directions[code])
+        if position == next_step:
+            path_len += penalty - 1
+            stalled += 1
+            if stalled == genetic_alg.stall_limit:
+                break
+        else:
+            stalled = 0
+        position = next_step
+    return position, path_len
+
+
+def run_generations(genetic_alg):
+    """
+    :return: the walks and the fitness of every generation
+    """
+    generations = []
+    for i in range(GENERATIONS):
+        genetic_alg.new_generation()
+        generations.append((genetic_alg.fitness(), genetic_alg.cur_gen_fitness))
+    genetic_alg.close()
+    return generations
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+def test_backends_agree(options):
+    expected = run_generations(create_genetic_alg('python', **options))
+    for backend in BACKENDS:
+        for cache_size in [0, 100]:
+            assert run_generations(create_genetic_alg(backend, cache_size, **options)) == expected, \
+                (backend, cache_size)
+
+
+@pytest.mark.parametrize('options', OPTIONS)
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_walks_match_make_step(backend, options):
+    genetic_alg = create_genetic_alg(backend, **options)
+    assert genetic_alg.obstacles_len > 0
+    for i in range(GENERATIONS):
+        chromosomes = genetic_alg.chromosome_lists(genetic_alg.cur_gen_codes, genetic_alg.cur_gen_lengths)
+        assert genetic_alg.fitness() == [make_step_walk(genetic_alg, chromosome) for chromosome in chromosomes]
+        genetic_alg.new_generation()
+    genetic_alg.close()
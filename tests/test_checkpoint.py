@@ -0,0 +1,55 @@
+"""
+a checkpointed and resumed run creates the same generations as a run that was never interrupted.
+run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+from genetic_algorithem.checkpoint import restore, snapshot, write_snapshot
+from genetic_algorithem.genetic_alg import GeneticAlg
+
+GENERATIONS = 30
+CHECKPOINT_GENERATION = 10
+
+
+def create_genetic_alg(**kwargs):
+    return GeneticAlg(40, 20, (0, 0), (19, 17), 0.2, backend='numpy', rng=2, **kwargs)
+
+
+def run_generations(genetic_alg, generations):
+    while genetic_alg.cur_generation < generations:
+        genetic_alg.new_generation()
+    return genetic_alg
+
+
+def assert_same_run(genetic_alg, expected):
+    assert genetic_alg.cur_generation == expected.cur_generation
+    np.testing.assert_array_equal(genetic_alg.cur_gen_codes, expected.cur_gen_codes)
+    assert genetic_alg.cur_gen_fitness == expected.cur_gen_fitness
+    assert genetic_alg.best_fitness == expected.best_fitness
+    assert genetic_alg.average_fitness == expected.average_fitness
+    assert (genetic_alg.cur_best_length, genetic_alg.cur_best_distance) == \
+           (expected.cur_best_length, expected.cur_best_distance)
+    assert genetic_alg.cur_best_path == expected.cur_best_path
+
+
+@pytest.mark.parametrize('cache_size', [0, 100])
+@pytest.mark.parametrize('options', [{}, {'variable_length': True}, {'selection': 'tournament'}])
+def test_resumed_run_matches_uninterrupted_run(tmp_path, cache_size, options):
+    expected = run_generations(create_genetic_alg(**options), GENERATIONS)
+
+    interrupted = run_generations(create_genetic_alg(cache_size=cache_size, **options), CHECKPOINT_GENERATION)
+    path = str(tmp_path / 'run.npz')
+    write_snapshot(snapshot(interrupted), path)
+    resumed = restore(path, cache_size=cache_size)
+    assert_same_run(resumed, interrupted)
+    assert_same_run(run_generations(resumed, GENERATIONS), expected)
+
+
+def test_restore_rejects_another_selection(tmp_path):
+    path = str(tmp_path / 'run.npz')
+    write_snapshot(snapshot(run_generations(create_genetic_alg(selection='rank'), CHECKPOINT_GENERATION)), path)
+    assert restore(path, selection='rank').selection.name == 'rank'
+    with pytest.raises(ValueError):
+        restore(path, selection='roulette')